@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import importlib.util
+import inspect
+from functools import cache
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import fastapi.routing
+import fastapi.utils
+
+_CLONED_TYPES: "WeakKeyDictionary[Any, Any]" = WeakKeyDictionary()
+
+
+def install_cloned_field_cache() -> None:
+    """Share one response_model clone cache across all routes (backport of tiangolo/fastapi#4105).
+
+    Older FastAPI releases clone the whole pydantic model tree for every `response_model=`
+    with a fresh `cloned_types` dict. Releases that already cache clones, or skip cloning
+    under pydantic v2, no longer expose a `cloned_types` hook and are left untouched.
+    """
+
+    original = getattr(fastapi.utils, "create_cloned_field", None)
+    if original is None or getattr(original, "__pka_cached__", False):
+        return
+    if "cloned_types" not in inspect.signature(original).parameters:
+        return
+
+    def create_cloned_field(field: Any, *, cloned_types: Any = None) -> Any:
+        return original(field, cloned_types=_CLONED_TYPES if cloned_types is None else cloned_types)
+
+    create_cloned_field.__pka_cached__ = True  # type: ignore[attr-defined]
+    fastapi.utils.create_cloned_field = create_cloned_field
+    if getattr(fastapi.routing, "create_cloned_field", None) is original:
+        fastapi.routing.create_cloned_field = create_cloned_field
+
+
+@cache
+def http2_available() -> bool:
+    """True when httpx's optional HTTP/2 support (the `h2` package) is installed."""
+
+    return importlib.util.find_spec("h2") is not None
+
+
+__all__ = ["http2_available", "install_cloned_field_cache"]
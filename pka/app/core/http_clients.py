@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import httpx
+
+from .compat import http2_available
+
+# Reference-counted AsyncClients shared by every Ollama-facing service pointing at the same server.
+_CLIENTS: Dict[Tuple[str, int], httpx.AsyncClient] = {}
+_CLIENT_REFS: Dict[Tuple[str, int], int] = {}
+
+
+def acquire_client(base_url: str, timeout: int) -> httpx.AsyncClient:
+    """Return the shared client for (base_url, timeout); pair every call with `release_client`."""
+
+    key = (base_url, timeout)
+    client = _CLIENTS.get(key)
+    if client is None or client.is_closed:
+        # HTTP/2 only kicks in over TLS (e.g. Ollama behind a reverse proxy) and needs `h2`.
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            http2=http2_available(),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+        )
+        _CLIENTS[key] = client
+        _CLIENT_REFS[key] = 0
+    _CLIENT_REFS[key] += 1
+    return client
+
+
+async def release_client(base_url: str, timeout: int) -> None:
+    """Drop one reference; the last one closes the client."""
+
+    key = (base_url, timeout)
+    remaining = _CLIENT_REFS.get(key, 0) - 1
+    if remaining > 0:
+        _CLIENT_REFS[key] = remaining
+        return
+    _CLIENT_REFS.pop(key, None)
+    client = _CLIENTS.pop(key, None)
+    if client is not None:
+        # The last user closes the pool, so a later event loop (asyncio.run) gets a fresh one.
+        await client.aclose()
+
+
+__all__ = ["acquire_client", "release_client"]
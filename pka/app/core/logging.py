@@ -17,6 +17,8 @@ def configure_logging(level: Optional[str] = None) -> None:
         stream=sys.stdout,
         force=True,
     )
+    # SQL statement logging is opt-in; the engine no longer uses echo=True in development.
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.sql_echo else logging.WARNING)
 
 
 __all__ = ["configure_logging"]
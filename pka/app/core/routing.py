@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.routing import compile_path, get_name
+
+
+class DeferredAPIRoute(APIRoute):
+    """APIRoute that postpones dependant/field computation until the route is first used.
+
+    Only the attributes needed to match and name the route are populated eagerly; the
+    expensive FastAPI state (`dependant`, `body_field`, `response_field`, the ASGI handler,
+    ...) is built on first access so importing routers and calling `include_router` stays cheap.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self._deferred_init: Tuple[str, Callable[..., Any], dict] | None = (path, endpoint, kwargs)
+        self.path = path
+        self.endpoint = endpoint
+        self.name = get_name(endpoint) if kwargs.get("name") is None else kwargs["name"]
+        self.methods = {method.upper() for method in kwargs.get("methods") or ["GET"]}
+        self.include_in_schema = kwargs.get("include_in_schema", True)
+        self.path_regex, self.path_format, self.param_convertors = compile_path(path)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes that have not been populated yet.
+        if name.startswith("__") or self.__dict__.get("_deferred_init") is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self._materialize()
+        return getattr(self, name)
+
+    def _materialize(self) -> None:
+        deferred = self.__dict__.get("_deferred_init")
+        if deferred is None:
+            return
+        self._deferred_init = None
+        path, endpoint, kwargs = deferred
+        super().__init__(path, endpoint, **kwargs)
+
+
+__all__ = ["DeferredAPIRoute"]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+
+def _default(value: Any) -> Any:
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if callable(isoformat) else str(value)
+
+
+def dumps_indented(data: Any) -> bytes:
+    """Serialise a report to indented UTF-8 JSON, using orjson when it is installed."""
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=_default)
+    return json.dumps(data, indent=2, default=_default).encode("utf-8")
+
+
+def dumps(data: Any) -> str:
+    """Serialise to compact JSON text, using orjson when it is installed."""
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=_default).decode("utf-8")
+    return json.dumps(data, default=_default)
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from raw response bytes; raises ValueError on malformed input either way."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["dumps", "dumps_indented", "loads"]
@@ -23,16 +23,16 @@ CREATE TABLE IF NOT EXISTS chunks (
     end_line        INTEGER,
     page_no         INTEGER,
     token_count     INTEGER,
-    embedding       vector(768),
+    embedding       halfvec(768),
     meta            JSONB NOT NULL DEFAULT '{}'::jsonb,
     CONSTRAINT uq_chunks_document_ordinal UNIQUE (document_id, ordinal)
 );
 
 CREATE INDEX IF NOT EXISTS idx_chunks_document_id ON chunks (document_id);
-CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON chunks USING ivfflat (embedding halfvec_cosine_ops) WITH (lists = 100);
 
 CREATE TABLE IF NOT EXISTS qa_runs (
-    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(), -- the app supplies time-ordered UUIDv7 ids
     question        TEXT NOT NULL,
     mode            VARCHAR(32) NOT NULL,
     llm_version     VARCHAR(64) NOT NULL,
@@ -44,7 +44,7 @@ CREATE TABLE IF NOT EXISTS qa_runs (
 );
 
 CREATE TABLE IF NOT EXISTS qa_contexts (
-    id              SERIAL PRIMARY KEY,
+    id              BIGSERIAL PRIMARY KEY,
     run_id          UUID NOT NULL REFERENCES qa_runs(id) ON DELETE CASCADE,
     chunk_id        INTEGER REFERENCES chunks(id) ON DELETE SET NULL,
     rank            INTEGER NOT NULL,
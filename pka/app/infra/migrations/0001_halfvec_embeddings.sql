@@ -0,0 +1,11 @@
+-- Store chunk embeddings as FP16 halfvec instead of FP32 vector (requires pgvector >= 0.7).
+-- Fresh databases get this from init.sql; run once against existing ones:
+--   psql -U pka -d pka -f pka/app/infra/migrations/0001_halfvec_embeddings.sql
+BEGIN;
+
+ALTER EXTENSION vector UPDATE;
+DROP INDEX IF EXISTS idx_chunks_embedding;
+ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(768) USING embedding::halfvec(768);
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON chunks USING ivfflat (embedding halfvec_cosine_ops) WITH (lists = 100);
+
+COMMIT;
@@ -1,66 +1,111 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from pka import __version__
 
+from .core.compat import install_cloned_field_cache
 from .core.logging import configure_logging
 from .core.settings import settings
-from .services.assistant import AssistantService
-from .services.health import ReadinessService
+from .services.assistant import shared_assistant_service
+from .services.health import shared_readiness_service
+
+logger = logging.getLogger(__name__)
+
+# Apps currently holding the shared services; the last one to shut down closes them.
+_SHARED_SERVICE_USERS = 0
+_SHARED_SERVICE_LOCK = threading.Lock()
+
+
+def _acquire_shared_services(app: FastAPI) -> None:
+    """Attach the process-wide services to `app` and count it as a user until its shutdown."""
+
+    global _SHARED_SERVICE_USERS
+    with _SHARED_SERVICE_LOCK:
+        if getattr(app.state, "holds_shared_services", False):
+            return
+        app.state.readiness_service = shared_readiness_service()
+        app.state.assistant_service = shared_assistant_service()
+        app.state.holds_shared_services = True
+        _SHARED_SERVICE_USERS += 1
+
+
+async def _release_shared_services(app: FastAPI) -> None:
+    """Drop `app`'s hold on the shared services, closing them once no app holds them."""
+
+    global _SHARED_SERVICE_USERS
+    with _SHARED_SERVICE_LOCK:
+        if not getattr(app.state, "holds_shared_services", False):
+            return
+        app.state.holds_shared_services = False
+        _SHARED_SERVICE_USERS -= 1
+        if _SHARED_SERVICE_USERS:
+            return
+        readiness_service = app.state.readiness_service
+        assistant_service = app.state.assistant_service
+        shared_readiness_service.cache_clear()
+        shared_assistant_service.cache_clear()
+    readiness_service.close()
+    await assistant_service.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run readiness checks and warm the assistant on startup; release shared clients on shutdown."""
+
+    # Re-acquire when this app was shut down before (e.g. a second TestClient context).
+    _acquire_shared_services(app)
+    readiness_service = app.state.readiness_service
+    assistant_service = app.state.assistant_service
+    if settings.skip_health_checks:
+        logger.warning("Skipping readiness checks (skip_health_checks=True)")
+    else:
+        status = readiness_service.run_checks()
+        if status.status != "pass":
+            failed = ", ".join(probe.name for probe in status.probes if not probe.healthy)
+            message = f"Readiness checks failed: {failed or 'unknown'}"
+            logger.error(message)
+            raise RuntimeError(message)
+    # Load the chat model in the background so the first /api/chat does not pay for it.
+    warmup = asyncio.create_task(assistant_service.warmup())
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await asyncio.gather(warmup, return_exceptions=True)
+        await _release_shared_services(app)
 
 
 def create_app() -> FastAPI:
     """Application factory for FastAPI initialization."""
 
     configure_logging()
+    install_cloned_field_cache()
 
-    from .services.docs import DocumentService
-
+    # No default_response_class: with the stock one FastAPI serialises response_model results
+    # straight to JSON bytes in pydantic-core, which a custom class (ORJSONResponse) disables.
     app = FastAPI(
         title=settings.app_name,
         version=__version__,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
-    readiness_service = ReadinessService()
-    app.state.readiness_service = readiness_service
+    # Held from construction so routes work even when the lifespan never runs.
+    _acquire_shared_services(app)
 
     static_dir = Path(__file__).resolve().parent / "web" / "static"
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
-
-    assistant_service = AssistantService(
-        base_url=settings.ollama_base_url,
-        model=settings.ollama_chat_model,
-        temperature=settings.llm_temperature,
-        seed=settings.llm_seed,
-        timeout=settings.ollama_timeout_seconds,
-        keep_alive=settings.ollama_keep_alive,
-    )
-
-    app.state.assistant_service = assistant_service
-
-    @app.on_event("startup")
-    async def _run_startup_checks() -> None:
-        if settings.skip_health_checks:
-            logging.getLogger(__name__).warning("Skipping readiness checks (skip_health_checks=True)")
-            return
-        status = readiness_service.run_checks()
-        if status.status != "pass":
-            failed = ", ".join(probe.name for probe in status.probes if not probe.healthy)
-            message = f"Readiness checks failed: {failed or 'unknown'}"
-            logging.getLogger(__name__).error(message)
-            raise RuntimeError(message)
-
-    @app.on_event("shutdown")
-    async def _cleanup_resources() -> None:
-        readiness_service.close()
-        await assistant_service.close()
+    # check_dir=False defers the directory check to the first /static request.
+    app.mount("/static", StaticFiles(directory=static_dir, check_dir=False), name="static")
 
     register_routers(app)
     return app
@@ -69,8 +114,11 @@ def create_app() -> FastAPI:
 def register_routers(app: FastAPI) -> None:
     """Attach API routers to the FastAPI app instance."""
 
+    from .core.routing import DeferredAPIRoute
     from .routers import chat, health, web  # local import to avoid circular dependencies
 
+    # Routes added directly on the app (or re-created during inclusion) also defer field computation.
+    app.router.route_class = DeferredAPIRoute
     app.include_router(web.router)
     app.include_router(health.router)
     app.include_router(chat.router)
@@ -79,4 +127,4 @@ def register_routers(app: FastAPI) -> None:
 app = create_app()
 
 
-__all__ = ["app", "create_app", "register_routers"]
+__all__ = ["app", "create_app", "lifespan", "register_routers"]
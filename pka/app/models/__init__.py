@@ -22,9 +22,10 @@ _SCHEMA_EXPORTS = {"HealthProbe", "HealthStatus"}
 
 def __getattr__(name: str):
     if name in _MODEL_EXPORTS:
-        module = import_module(".db", __name__)
-        return getattr(module, name)
-    if name in _SCHEMA_EXPORTS:
-        module = import_module(".schema", __name__)
-        return getattr(module, name)
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(import_module(".db", __name__), name)
+    elif name in _SCHEMA_EXPORTS:
+        value = getattr(import_module(".schema", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # cache so later lookups bypass __getattr__
+    return value
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import logging
+import os
+import time
 import uuid
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Generator, List, Optional
+from functools import cache
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence
 
-from pgvector.sqlalchemy import Vector
+from pgvector import HalfVector
+from pgvector.sqlalchemy import HALFVEC
 from sqlalchemy import (
     BigInteger,
     Boolean,
     DateTime,
+    Engine,
     Float,
     ForeignKey,
     Integer,
@@ -17,14 +23,50 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     create_engine,
+    delete,
+    event,
     func,
+    insert,
+    select,
     text as sa_text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship, sessionmaker
 
+from ..core.serialization import dumps as json_dumps, loads as json_loads
 from ..core.settings import settings
 
+logger = logging.getLogger(__name__)
+
+
+def uuid7() -> uuid.UUID:
+    """Return a time-ordered UUIDv7 (RFC 9562) so new run ids land at the right edge of the index."""
+
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+class BinaryHalfVector(HALFVEC):
+    """pgvector `halfvec` column bound as a `pgvector.HalfVector` so psycopg sends it in binary format.
+
+    Embeddings are stored as FP16, half the bytes of `vector`, and the ANN scan runs on
+    pgvector's halfvec kernels. The stock type renders every float through `str()`; the
+    binary dumper registered by `register_vector` packs the whole array at once.
+    """
+
+    cache_ok = True
+
+    def bind_processor(self, dialect: Any) -> Any:
+        def process(value: Any) -> Any:
+            if value is None or isinstance(value, HalfVector):
+                return value
+            return HalfVector(list(value) if isinstance(value, tuple) else value)
+
+        return process
+
 
 class Base(DeclarativeBase):
     """Declarative base for ORM models."""
@@ -46,8 +88,13 @@ class Document(Base):
     size: Mapped[int] = mapped_column(BigInteger, nullable=False)
     meta: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict, server_default=sa_text("'{}'::jsonb"))
 
+    # ordinal is NOT NULL and unique per document, so uq_chunks_document_ordinal serves this order.
     chunks: Mapped[List["Chunk"]] = relationship(
-        "Chunk", back_populates="document", cascade="all, delete-orphan", passive_deletes=True
+        "Chunk",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Chunk.ordinal",
     )
 
 
@@ -63,7 +110,7 @@ class Chunk(Base):
     end_line: Mapped[Optional[int]] = mapped_column(Integer)
     page_no: Mapped[Optional[int]] = mapped_column(Integer)
     token_count: Mapped[Optional[int]] = mapped_column(Integer)
-    embedding: Mapped[Optional[List[float]]] = mapped_column(Vector(settings.vector_dim))
+    embedding: Mapped[Optional[List[float]]] = mapped_column(BinaryHalfVector(settings.vector_dim))
     meta: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict, server_default=sa_text("'{}'::jsonb"))
 
     document: Mapped[Document] = relationship("Document", back_populates="chunks")
@@ -73,7 +120,7 @@ class Chunk(Base):
 class QARun(Base):
     __tablename__ = "qa_runs"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     question: Mapped[str] = mapped_column(Text, nullable=False)
     mode: Mapped[str] = mapped_column(String(32), nullable=False)
     llm_version: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -94,7 +141,7 @@ class QARun(Base):
 class QAContext(Base):
     __tablename__ = "qa_contexts"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     run_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("qa_runs.id", ondelete="CASCADE"), nullable=False)
     chunk_id: Mapped[Optional[int]] = mapped_column(ForeignKey("chunks.id", ondelete="SET NULL"))
     rank: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -116,15 +163,53 @@ class QAAnswer(Base):
     run: Mapped[QARun] = relationship("QARun", back_populates="answer")
 
 
-engine = create_engine(settings.database_url, echo=settings.app_env == "development", pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+@cache
+def get_engine() -> Engine:
+    """Create the engine on first use so importing the models never opens a pool."""
+
+    url = make_url(settings.database_url)
+    psycopg3 = url.drivername == "postgresql+psycopg"
+    engine = create_engine(
+        url,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        pool_recycle=300,
+        insertmanyvalues_page_size=500,
+        # JSONB columns (document meta, QA answers) round-trip through orjson when installed.
+        json_serializer=json_dumps,
+        json_deserializer=json_loads,
+        # psycopg 3 prepares statements after five executions; TCP keepalives catch dead peers.
+        connect_args={"prepare_threshold": 5, "keepalives": 1, "keepalives_idle": 60} if psycopg3 else {},
+    )
+    if psycopg3:
+        event.listen(engine, "connect", _register_vector)
+    return engine
+
+
+def _register_vector(dbapi_connection: Any, _connection_record: Any) -> None:
+    # Imported here so psycopg is only loaded once an engine actually connects.
+    from pgvector.psycopg import register_vector
+
+    register_vector(dbapi_connection)
+
+
+@cache
+def get_session_local() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), expire_on_commit=False, class_=Session)
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_local()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @contextmanager
 def session_scope() -> Generator[Session, None, None]:
     """Provide a transactional scope around a series of operations."""
 
-    session = SessionLocal()
+    session = get_session_local()()
     try:
         yield session
         session.commit()
@@ -135,6 +220,139 @@ def session_scope() -> Generator[Session, None, None]:
         session.close()
 
 
+class BatchedSession:
+    """One session whose transaction is committed every `batch_size` units of work.
+
+    Each `unit()` runs in a SAVEPOINT, so a failing unit is rolled back on its own. Callbacks
+    registered with `after_commit()` run once the enclosing transaction has committed (and are
+    dropped if their unit or the batch is rolled back). `batch_size=1` commits every unit.
+    """
+
+    def __init__(self, batch_size: int = 50) -> None:
+        self.batch_size = max(1, batch_size)
+        self._session: Optional[Session] = None
+        self._units = 0
+        self._callbacks: List[Callable[[], None]] = []
+
+    @contextmanager
+    def unit(self) -> Generator[Session, None, None]:
+        if self._session is None:
+            self._session = get_session_local()()
+        session = self._session
+        callback_count = len(self._callbacks)
+        try:
+            with session.begin_nested():
+                yield session
+        except Exception:
+            del self._callbacks[callback_count:]
+            raise
+        self._units += 1
+        if self._units >= self.batch_size:
+            self.commit()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def commit(self) -> None:
+        """Commit the units written so far, then run their callbacks."""
+
+        if self._session is None:
+            return
+        units, self._units = self._units, 0
+        callbacks, self._callbacks = self._callbacks, []
+        try:
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            logger.error("Batch commit failed; rolled back %d unit(s)", units)
+            raise
+        for callback in callbacks:
+            callback()
+
+    def close(self) -> None:
+        """Commit any remaining units and release the session."""
+
+        try:
+            self.commit()
+        finally:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_CHUNK_COPY_COLUMNS = ("document_id", "ordinal", "text", "start_line", "end_line", "page_no", "token_count", "embedding")
+_CHUNK_COPY_TYPES = ("int4", "int4", "text", "int4", "int4", "int4", "int4", "halfvec")
+
+
+def stored_checksum(path: str) -> Optional[str]:
+    """Return the sha256 recorded for the document at `path`, or None if it was never ingested."""
+
+    with session_scope() as session:
+        return session.query(Document.sha256).filter_by(path=path).scalar()
+
+
+def bulk_insert_chunks(session: Session, document_id: int, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """Insert one document's chunks in a single round trip and return their ids in row order.
+
+    On psycopg the rows are streamed with binary COPY (embeddings go through pgvector's binary
+    dumper); other drivers fall back to one executemany INSERT ... RETURNING. Rows bypass the
+    ORM identity map, so `document.chunks` is stale until the session is refreshed.
+    """
+
+    if not rows:
+        return []
+    session.flush()
+    connection = session.connection()
+    if connection.dialect.driver == "psycopg":
+        driver_connection = connection.connection.driver_connection
+        columns = ", ".join(_CHUNK_COPY_COLUMNS)
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(f"COPY chunks ({columns}) FROM STDIN WITH (FORMAT BINARY)") as copy:
+                copy.set_types(list(_CHUNK_COPY_TYPES))
+                for row in rows:
+                    embedding = row.get("embedding")
+                    copy.write_row(
+                        (
+                            document_id,
+                            row["ordinal"],
+                            row["text"],
+                            row.get("start_line"),
+                            row.get("end_line"),
+                            row.get("page_no"),
+                            row.get("token_count"),
+                            None if embedding is None else HalfVector(embedding),
+                        )
+                    )
+        ids = {
+            ordinal: chunk_id
+            for chunk_id, ordinal in session.execute(
+                select(Chunk.id, Chunk.ordinal).where(Chunk.document_id == document_id)
+            )
+        }
+        return [ids[row["ordinal"]] for row in rows]
+
+    result = session.execute(
+        insert(Chunk).returning(Chunk.id, sort_by_parameter_order=True),
+        [{**row, "document_id": document_id} for row in rows],
+    )
+    return list(result.scalars())
+
+
+def delete_document_chunks(session: Session, document_id: int) -> List[int]:
+    """Delete a document's chunks (and their QA contexts, as the ORM cascade would) in two statements.
+
+    Returns the removed chunk ids so callers can drop them from the BM25 index.
+    """
+
+    chunk_ids = select(Chunk.id).where(Chunk.document_id == document_id).scalar_subquery()
+    options = {"synchronize_session": False}
+    session.execute(delete(QAContext).where(QAContext.chunk_id.in_(chunk_ids)), execution_options=options)
+    result = session.execute(
+        delete(Chunk).where(Chunk.document_id == document_id).returning(Chunk.id), execution_options=options
+    )
+    return list(result.scalars())
+
+
 def get_session() -> Generator[Session, None, None]:
     """FastAPI dependency for database sessions."""
 
@@ -149,8 +367,13 @@ __all__ = [
     "QARun",
     "QAContext",
     "QAAnswer",
-    "engine",
-    "SessionLocal",
+    "get_engine",
+    "get_session_local",
     "session_scope",
     "get_session",
+    "BatchedSession",
+    "stored_checksum",
+    "bulk_insert_chunks",
+    "delete_document_chunks",
+    "uuid7",
 ]
@@ -7,5 +7,7 @@ __all__ = ["health", "chat", "web"]
 
 def __getattr__(name: str):
     if name in __all__:
-        return import_module(f".{name}", __name__)
+        module = import_module(f".{name}", __name__)
+        globals()[name] = module  # cache so later lookups bypass __getattr__
+        return module
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
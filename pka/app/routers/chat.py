@@ -5,11 +5,12 @@ import uuid
 
 from fastapi import APIRouter, Depends, Request
 
+from ..core.routing import DeferredAPIRoute
 from ..core.settings import settings
 from ..models.schema import ChatRequest, ChatResponse
 from ..services.assistant import AssistantService, AssistantServiceError
 
-router = APIRouter(prefix="/api", tags=["chat"])
+router = APIRouter(prefix="/api", tags=["chat"], route_class=DeferredAPIRoute)
 
 
 def get_assistant_service(request: Request) -> AssistantService:
@@ -36,6 +37,6 @@ async def chat_endpoint(
         question=payload.question,
         mode=payload.mode,
         llm_version=settings.ollama_chat_model,
-        prompt_version="assistant-v1",
-        template_hash="assistant-v1",
+        prompt_version=assistant.prompt_version,
+        template_hash=assistant.template_hash,
     )
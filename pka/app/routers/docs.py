@@ -4,12 +4,14 @@ from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
+
+from ..core.routing import DeferredAPIRoute
 from ..models.schema import DocumentChunkModel, DocumentResponse
 
 if TYPE_CHECKING:  # pragma: no cover - type checking only
     from ..services.docs import DocumentService
 
-router = APIRouter(prefix="/api/docs", tags=["documents"])
+router = APIRouter(prefix="/api/docs", tags=["documents"], route_class=DeferredAPIRoute)
 
 
 def get_document_service(request: Request) -> "DocumentService":
@@ -17,10 +19,16 @@ def get_document_service(request: Request) -> "DocumentService":
     return service
 
 
+_real_get_session = None
+
+
 def get_db_session():
-    from ..models.db import get_session as real_get_session
+    global _real_get_session
+    if _real_get_session is None:
+        from ..models.db import get_session  # bound on first request to keep router import light
 
-    yield from real_get_session()
+        _real_get_session = get_session
+    yield from _real_get_session()
 
 
 @router.get("/{document_id}", response_model=DocumentResponse, summary="Document metadata and chunk previews")
@@ -33,8 +41,10 @@ def fetch_document(
     if record is None:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    # Rows come straight from the ORM, so skip per-chunk validation; FastAPI serialises the
+    # response_model directly to JSON bytes without re-validating these instances.
     chunks = [
-        DocumentChunkModel(
+        DocumentChunkModel.model_construct(
             id=chunk.id,
             ordinal=chunk.ordinal,
             preview=chunk.text,
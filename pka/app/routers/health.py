@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Request
 
+from ..core.routing import DeferredAPIRoute
 from ..models.schema import HealthStatus
 from ..services.health import ReadinessService
 
-router = APIRouter(prefix="/health", tags=["health"])
+router = APIRouter(prefix="/health", tags=["health"], route_class=DeferredAPIRoute)
 
 
 def get_readiness_service(request: Request) -> ReadinessService:
@@ -14,7 +15,9 @@ def get_readiness_service(request: Request) -> ReadinessService:
 
 
 @router.get("/", response_model=HealthStatus, summary="Application health status")
-def health_check(service: ReadinessService = Depends(get_readiness_service)) -> HealthStatus:
-    """Return current readiness state for core dependencies."""
+def health_check(
+    refresh: bool = False, service: ReadinessService = Depends(get_readiness_service)
+) -> HealthStatus:
+    """Return current readiness state for core dependencies; `?refresh=true` bypasses the short cache."""
 
-    return service.run_checks()
+    return service.run_checks(force=refresh)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from functools import cache, lru_cache
 from pathlib import Path
 
 from fastapi import APIRouter, Request
@@ -8,68 +9,71 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from ... import __version__
+from ..core.routing import DeferredAPIRoute
 from ..core.settings import settings
 from ..services.health import ReadinessService
 
-templates = Jinja2Templates(directory=str(Path(__file__).resolve().parents[1] / "web" / "templates"))
-templates.env.globals["static_version"] = __version__
+router = APIRouter(tags=["web"], route_class=DeferredAPIRoute)
 
-router = APIRouter(tags=["web"])
 
+@cache
+def _templates() -> Jinja2Templates:
+    """Build the Jinja environment on first render rather than at import time."""
 
-def _load_validation_report() -> dict | None:
-    report_path = Path(__file__).resolve().parents[2] / "validation_report.json"
-    if not report_path.exists():
+    templates = Jinja2Templates(directory=str(Path(__file__).resolve().parents[1] / "web" / "templates"))
+    templates.env.globals["static_version"] = __version__
+    return templates
+
+
+# Page-independent template values; settings are loaded once per process.
+_BASE_CONTEXT = {
+    "assistant_model": settings.ollama_chat_model,
+    "ollama_url": settings.ollama_base_url,
+    "settings": settings,
+}
+
+_VALIDATION_REPORT_PATH = Path(__file__).resolve().parents[2] / "validation_report.json"
+
+
+@lru_cache(maxsize=1)
+def _read_validation_report(mtime_ns: int, size: int) -> dict | None:
+    # Keyed on the file's mtime/size so a fresh `validate` run is picked up on the next request.
+    try:
+        return json.loads(_VALIDATION_REPORT_PATH.read_bytes())
+    except (OSError, json.JSONDecodeError):
         return None
+
+
+def _load_validation_report() -> dict | None:
     try:
-        return json.loads(report_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
+        stat = _VALIDATION_REPORT_PATH.stat()
+    except OSError:
         return None
+    return _read_validation_report(stat.st_mtime_ns, stat.st_size)
 
 
 @router.get("/", response_class=HTMLResponse)
 async def chat_home(request: Request) -> HTMLResponse:
     """Render the chat interface shell."""
 
-    context = {
-        "request": request,
-        "title": "NestAi",
-        "active_page": "home",
-        "assistant_model": settings.ollama_chat_model,
-        "ollama_url": settings.ollama_base_url,
-        "settings": settings,
-    }
-    return templates.TemplateResponse("chat.html", context)
+    context = {**_BASE_CONTEXT, "request": request, "title": "NestAi", "active_page": "home"}
+    return _templates().TemplateResponse("chat.html", context)
 
 
 @router.get("/library", response_class=HTMLResponse)
 async def library_view(request: Request) -> HTMLResponse:
     """Render conversation library placeholder."""
 
-    context = {
-        "request": request,
-        "title": "Library - NestAi",
-        "active_page": "library",
-        "assistant_model": settings.ollama_chat_model,
-        "ollama_url": settings.ollama_base_url,
-        "settings": settings,
-    }
-    return templates.TemplateResponse("library.html", context)
+    context = {**_BASE_CONTEXT, "request": request, "title": "Library - NestAi", "active_page": "library"}
+    return _templates().TemplateResponse("library.html", context)
 
 
 @router.get("/settings", response_class=HTMLResponse)
 async def settings_view(request: Request) -> HTMLResponse:
     """Render settings placeholder."""
 
-    context = {
-        "request": request,
-        "title": "Settings - NestAi",
-        "active_page": "settings",
-        "assistant_model": settings.ollama_chat_model,
-        "ollama_url": settings.ollama_base_url,
-        "settings": settings,
-    }
-    return templates.TemplateResponse("settings.html", context)
+    context = {**_BASE_CONTEXT, "request": request, "title": "Settings - NestAi", "active_page": "settings"}
+    return _templates().TemplateResponse("settings.html", context)
 
 
 @router.get("/diagnostics", response_class=HTMLResponse)
@@ -81,16 +85,14 @@ async def diagnostics_view(request: Request) -> HTMLResponse:
     validation_report = _load_validation_report()
 
     context = {
+        **_BASE_CONTEXT,
         "request": request,
         "title": "Diagnostics - NestAi",
         "active_page": "diagnostics",
-        "assistant_model": settings.ollama_chat_model,
-        "ollama_url": settings.ollama_base_url,
         "readiness": readiness,
         "validation_report": validation_report,
-        "settings": settings,
     }
-    return templates.TemplateResponse("diagnostics.html", context)
+    return _templates().TemplateResponse("diagnostics.html", context)
 
 
 __all__ = ["router"]
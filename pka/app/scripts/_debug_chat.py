@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+from ..core.settings import settings
+from ..services.synth import ChatService, PromptTemplate, PromptTemplateRegistry
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "services" / "synth" / "response_schema.json"
+
+
+@lru_cache(maxsize=8)
+def _debug_registry(template_text: str) -> PromptTemplateRegistry:
+    registry = PromptTemplateRegistry()
+    registry.register(PromptTemplate(name="debug", version="1.0.0", content=template_text))
+    return registry
+
+
+def build_debug_chat_service(template_text: str) -> ChatService:
+    """Fresh ChatService for ad-hoc debugging scripts; the caller owns it and must close it.
+
+    Only the template registry is cached. The schema is parsed once per process by
+    ChatService itself, and instances share the pooled Ollama client.
+    """
+
+    return ChatService(
+        base_url=settings.ollama_base_url,
+        model=settings.ollama_chat_model,
+        temperature=settings.llm_temperature,
+        seed=settings.llm_seed,
+        timeout=settings.ollama_timeout_seconds,
+        keep_alive=settings.ollama_keep_alive,
+        template_registry=_debug_registry(template_text),
+        template_name="debug",
+        schema_path=SCHEMA_PATH,
+    )
+
+
+__all__ = ["build_debug_chat_service"]
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import argparse
 import logging
+import shutil
+from pathlib import Path
 
 from ..core.logging import configure_logging
 from ..core.settings import settings
@@ -18,6 +20,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--batch-size", type=int, default=16, help="Batch size for embedding requests"
     )
+    parser.add_argument(
+        "--embed-concurrency", type=int, default=4, help="Embedding batches kept in flight at once"
+    )
     parser.add_argument(
         "--max-tokens",
         type=int,
@@ -30,6 +35,12 @@ def parse_args() -> argparse.Namespace:
         default=0.12,
         help="Fractional overlap ratio between consecutive chunks",
     )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=None,
+        help="Also write the optimized BM25 index to this .tar.gz for deployment",
+    )
     return parser.parse_args()
 
 
@@ -46,24 +57,25 @@ def main() -> None:
         timeout=settings.ollama_timeout_seconds,
         batch_size=args.batch_size,
         expected_dim=settings.vector_dim,
+        concurrency=args.embed_concurrency,
     )
-    bm25_service = BM25IndexService(settings.bm25_index_path)
+    bm25_service = BM25IndexService(settings.bm25_index_path.resolve())
     markdown_service = MarkdownIngestService(
-        source_dir=settings.knowledge_notes_dir,
+        source_dir=settings.knowledge_notes_dir.resolve(),
         embedding_service=embedding_service,
         bm25_service=bm25_service,
         max_tokens=args.max_tokens,
         overlap_ratio=args.overlap,
     )
     pdf_service = PDFIngestService(
-        source_dir=settings.knowledge_pdfs_dir,
+        source_dir=settings.knowledge_pdfs_dir.resolve(),
         embedding_service=embedding_service,
         bm25_service=bm25_service,
         max_tokens=args.max_tokens,
         overlap_tokens=max(1, int(args.max_tokens * args.overlap)),
     )
     email_service = EmailIngestService(
-        source_dir=settings.knowledge_emails_dir,
+        source_dir=settings.knowledge_emails_dir.resolve(),
         embedding_service=embedding_service,
         bm25_service=bm25_service,
         max_tokens=600,
@@ -73,8 +85,16 @@ def main() -> None:
         markdown_service.ingest(limit=args.limit)
         pdf_service.ingest(limit=args.limit)
         email_service.ingest(limit=args.limit)
+        segments = bm25_service.optimize()
+        logger.info("BM25 index settled into %d segment(s).", segments)
+        if args.archive is not None:
+            archive_base = str(args.archive).removesuffix(".tar.gz")
+            index_dir = bm25_service.index_path
+            archive = shutil.make_archive(archive_base, "gztar", root_dir=index_dir.parent, base_dir=index_dir.name)
+            logger.info("Packaged BM25 index at %s", archive)
     finally:
         embedding_service.close()
+        bm25_service.close()
         logger.info("Reindex completed.")
 
 
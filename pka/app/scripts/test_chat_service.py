@@ -4,6 +4,7 @@ import argparse
 import asyncio
 import sys
 import textwrap
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List
 
@@ -30,6 +31,10 @@ else:
     )
 
 
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "services" / "synth" / "response_schema.json"
+
+
+@lru_cache(maxsize=1)
 def _build_template_registry() -> PromptTemplateRegistry:
     registry = PromptTemplateRegistry()
     registry.register(
@@ -58,8 +63,7 @@ def _build_template_registry() -> PromptTemplateRegistry:
     return registry
 
 
-def _build_chat_service(max_retries: int) -> ChatService:
-    schema_path = Path(__file__).resolve().parents[1] / "services" / "synth" / "response_schema.json"
+def _build_chat_service(max_retries: int, stream: bool = False) -> ChatService:
     registry = _build_template_registry()
     return ChatService(
         base_url=settings.ollama_base_url,
@@ -67,10 +71,13 @@ def _build_chat_service(max_retries: int) -> ChatService:
         temperature=settings.llm_temperature,
         seed=settings.llm_seed,
         timeout=settings.ollama_timeout_seconds,
+        keep_alive=settings.ollama_keep_alive,
+        max_concurrency=settings.ollama_max_concurrency,
         template_registry=registry,
         template_name="cite_or_abstain_v1",
-        schema_path=schema_path,
+        schema_path=SCHEMA_PATH,
         max_retries=max(0, max_retries),
+        stream=stream,
     )
 
 
@@ -111,7 +118,7 @@ def _parse_contexts(values: Iterable[str] | None) -> List[ContextSnippet]:
 
 
 async def _run(args: argparse.Namespace) -> int:
-    chat = _build_chat_service(args.max_retries)
+    chat = _build_chat_service(args.max_retries, stream=args.stream)
     snippets = _parse_contexts(args.contexts)
 
     try:
@@ -173,6 +180,11 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Print the raw LLM response in addition to the parsed JSON output.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the response and stop reading once the JSON answer object is complete.",
+    )
     return parser
 
 
@@ -6,8 +6,9 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 from time import perf_counter
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
+from ..core.serialization import dumps_indented
 from ..core.settings import settings
 from ..services.assistant import AssistantService, AssistantServiceError
 from ..services.health import ReadinessService
@@ -48,7 +49,7 @@ def run_embedding() -> Dict[str, Any]:
         return {
             "passed": True,
             "latency_ms": latency_ms,
-            "vector_dim": len(vectors[0]) if vectors else 0,
+            "vector_dim": int(vectors.shape[1]) if len(vectors) else 0,
             "count": len(vectors),
         }
     except EmbeddingServiceError as exc:
@@ -83,6 +84,20 @@ async def run_chat(question: str) -> Dict[str, Any]:
         await assistant.close()
 
 
+async def run_checks(
+    question: str, *, skip_chat: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any] | None]:
+    """Run readiness, embedding and chat checks concurrently; the sync ones use worker threads."""
+
+    readiness_task = asyncio.to_thread(run_readiness)
+    embedding_task = asyncio.to_thread(run_embedding)
+    if skip_chat:
+        readiness, embedding = await asyncio.gather(readiness_task, embedding_task)
+        return readiness, embedding, None
+    readiness, embedding, chat_result = await asyncio.gather(readiness_task, embedding_task, run_chat(question))
+    return readiness, embedding, chat_result
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Full-stack validation for NestAi.")
     parser.add_argument(
@@ -94,11 +109,7 @@ def main() -> None:
     parser.add_argument("--skip-chat", action="store_true", help="Skip the chat validation step.")
     args = parser.parse_args()
 
-    readiness = run_readiness()
-    embedding = run_embedding()
-    chat_result: Dict[str, Any] | None = None
-    if not args.skip_chat:
-        chat_result = asyncio.run(run_chat(args.question))
+    readiness, embedding, chat_result = asyncio.run(run_checks(args.question, skip_chat=args.skip_chat))
 
     passed = readiness.get("passed") and embedding.get("passed") and (
         args.skip_chat or (chat_result and chat_result.get("passed"))
@@ -116,7 +127,7 @@ def main() -> None:
         "embedding": embedding,
         "chat": chat_result,
     }
-    args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    args.report.write_bytes(dumps_indented(report))
 
     print(json.dumps(report["summary"], indent=2))
     print(f"\nValidation report written to {args.report.resolve()}")
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+from functools import lru_cache
 from typing import Optional
 
 import httpx
 
+from ..core.http_clients import acquire_client, release_client
+from ..core.serialization import loads as json_loads
+from ..core.settings import settings
 from ..models.schema import ChatAnswer
 
 logger = logging.getLogger(__name__)
@@ -17,6 +23,8 @@ class AssistantServiceError(RuntimeError):
 class AssistantService:
     """Thin wrapper around the local Ollama chat API for personal assistant responses."""
 
+    prompt_version = "assistant-v1"
+
     def __init__(
         self,
         *,
@@ -26,19 +34,48 @@ class AssistantService:
         seed: Optional[int] = None,
         timeout: int = 60,
         keep_alive: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
-        self._client = httpx.AsyncClient(base_url=base_url.rstrip("/"), timeout=timeout)
+        self._client_key = (base_url.rstrip("/"), timeout)
+        self._client = acquire_client(*self._client_key)
+        self._closed = False
         self._model = model
         self._temperature = temperature
         self._seed = seed
         self._keep_alive = keep_alive
+        # Caps in-flight /api/chat calls; requests past the cap wait here rather than in Ollama.
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
         self._system_prompt = (
             "You are a privacy-preserving personal assistant running entirely on the user's machine. "
             "Provide concise, helpful answers. If you are unsure, say so clearly."
         )
+        # Hashed once here; the prompt is fixed for the lifetime of the service.
+        self.template_hash = hashlib.sha256(self._system_prompt.encode("utf-8")).hexdigest()
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._closed:
+            return
+        self._closed = True
+        await release_client(*self._client_key)
+
+    async def warmup(self) -> bool:
+        """Open the connection pool and have Ollama load the chat model ahead of the first request.
+
+        An empty-prompt `/api/generate` call only loads the model, so nothing is generated.
+        Failures are logged and reported as False; the first real request simply pays the cost.
+        """
+
+        payload: dict = {"model": self._model}
+        if self._keep_alive:
+            payload["keep_alive"] = self._keep_alive
+        try:
+            response = await self._client.post("/api/generate", json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            logger.warning("Assistant warm-up failed: %s", exc)
+            return False
+        logger.info("Assistant model %s loaded", self._model)
+        return True
 
     async def generate(self, question: str) -> ChatAnswer:
         prompt = question.strip()
@@ -62,9 +99,7 @@ class AssistantService:
             payload["keep_alive"] = self._keep_alive
 
         try:
-            response = await self._client.post("/api/chat", json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._post_chat(payload)
         except httpx.TimeoutException as exc:
             raise AssistantServiceError("Timed out waiting for Ollama response.") from exc
         except httpx.HTTPError as exc:
@@ -87,5 +122,33 @@ class AssistantService:
             sources=[],
         )
 
+    async def _post_chat(self, payload: dict) -> dict:
+        if self._slots is None:
+            response = await self._client.post("/api/chat", json=payload)
+        else:
+            async with self._slots:
+                response = await self._client.post("/api/chat", json=payload)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+
+@lru_cache(maxsize=1)
+def shared_assistant_service() -> AssistantService:
+    """Return the process-wide assistant configured from settings.
+
+    Reusing one instance keeps a single Ollama connection pool per process even when
+    `create_app()` runs several times (tests, reloads). Call `cache_clear()` after closing it.
+    """
+
+    return AssistantService(
+        base_url=settings.ollama_base_url,
+        model=settings.ollama_chat_model,
+        temperature=settings.llm_temperature,
+        seed=settings.llm_seed,
+        timeout=settings.ollama_timeout_seconds,
+        keep_alive=settings.ollama_keep_alive,
+        max_concurrency=settings.ollama_max_concurrency,
+    )
+
 
-__all__ = ["AssistantService", "AssistantServiceError"]
+__all__ = ["AssistantService", "AssistantServiceError", "shared_assistant_service"]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import math
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
@@ -10,8 +10,10 @@ from sqlalchemy.orm import Session, selectinload
 
 from ...models.db import Chunk, Document
 
+_WHITESPACE_RE = re.compile(r"\s+")
 
-@dataclass
+
+@dataclass(slots=True)
 class DocumentChunkView:
     id: int
     ordinal: int
@@ -22,7 +24,7 @@ class DocumentChunkView:
     token_count: Optional[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentView:
     id: int
     path: str
@@ -46,13 +48,23 @@ class DocumentService:
         stmt = (
             select(Document)
             .where(Document.id == document_id)
-            .options(selectinload(Document.chunks))
+            .options(
+                # Leave the embedding (and meta) columns on the server; previews never need them.
+                selectinload(Document.chunks).load_only(
+                    Chunk.id,
+                    Chunk.ordinal,
+                    Chunk.text,
+                    Chunk.start_line,
+                    Chunk.end_line,
+                    Chunk.page_no,
+                    Chunk.token_count,
+                )
+            )
         )
         document = session.execute(stmt).scalar_one_or_none()
         if document is None:
             return None
 
-        chunks = sorted(document.chunks, key=lambda chunk: (chunk.ordinal or math.inf, chunk.id))
         chunk_views = [
             DocumentChunkView(
                 id=chunk.id,
@@ -63,7 +75,7 @@ class DocumentService:
                 page_no=chunk.page_no,
                 token_count=chunk.token_count,
             )
-            for chunk in chunks
+            for chunk in document.chunks
         ]
 
         return DocumentView(
@@ -83,7 +95,14 @@ class DocumentService:
     def _build_preview(self, text: str) -> str:
         if not text:
             return ""
-        normalized = " ".join(text.split())
+        # Normalise only a bounded window; collapsing whitespace can shrink it, never grow it.
+        window = text[: self.preview_max_chars * 4]
+        if len(window) < len(text):
+            normalized = _WHITESPACE_RE.sub(" ", window).strip()
+            if len(normalized) > self.preview_max_chars:
+                return normalized[: self.preview_max_chars - 3] + "..."
+            # Mostly whitespace: the window alone cannot tell whether the text fits the cap.
+        normalized = _WHITESPACE_RE.sub(" ", text).strip()
         if len(normalized) <= self.preview_max_chars:
             return normalized
         return normalized[: self.preview_max_chars - 3] + "..."
@@ -1,24 +1,38 @@
 from __future__ import annotations
 
+import heapq
 import json
+import logging
+import os
 import statistics
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
 
 import httpx
 import yaml
 
+from ...core.compat import http2_available
+from ...core.serialization import dumps_indented, loads as json_loads
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONCURRENCY = 8
+CHAT_PATH = "/api/chat"
+ERROR_PREVIEW_BYTES = 512
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExampleExpectations:
     """Structured expectations for a single evaluation example."""
 
     min_sources: int = 1
     require_abstain: Optional[bool] = None
-    required_source_ids: Tuple[str, ...] = ()
+    required_source_ids: FrozenSet[str] = frozenset()
     max_latency_ms: Optional[int] = None
 
     @classmethod
@@ -28,27 +42,113 @@ class ExampleExpectations:
         return cls(
             min_sources=max(0, int(data.get("min_sources", 1))),
             require_abstain=data.get("require_abstain"),
-            required_source_ids=tuple(str(value) for value in data.get("required_sources", []) if value),
+            required_source_ids=frozenset(str(value) for value in data.get("required_sources", []) if value),
             max_latency_ms=int(data["max_latency_ms"]) if data.get("max_latency_ms") is not None else None,
         )
 
 
+# libyaml's C loader when PyYAML was built with it; same safe semantics either way.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+_DATASET_CACHE_SIZE = 100
+# path -> (mtime_ns, size, parsed dataset), least recently used first.
+_DATASET_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any]]]" = OrderedDict()
+_DATASET_CACHE_LOCK = threading.Lock()
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".cache.json")
+
+
+def _parse_dataset(path: Path, mtime_ns: int, sidecar: bool) -> Dict[str, Any]:
+    """Parse the YAML at `path`, going through a `<name>.cache.json` sidecar when `sidecar` is set.
+
+    The sidecar is used while it is at least as new as the YAML and rewritten (atomically)
+    after every YAML parse. Datasets that do not round-trip through JSON unchanged (dates,
+    sets, non-string mapping keys) are never cached.
+    """
+
+    cache_path = _sidecar_path(path)
+    if sidecar:
+        try:
+            if cache_path.stat().st_mtime_ns >= mtime_ns:
+                return json_loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            pass
+    data = yaml.load(path.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
+    if sidecar:
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            encoded = json.dumps(data, separators=(",", ":"))
+            # json.dumps quietly turns int/bool/None keys into strings; refuse lossy encodings.
+            if json.loads(encoded) != data:
+                raise ValueError("dataset does not round-trip through JSON")
+            tmp_path.write_text(encoded, encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("Skipping dataset cache %s: %s", cache_path, exc)
+            tmp_path.unlink(missing_ok=True)
+    return data
+
+
+def _load_yaml_cached(path: str, mtime_ns: int, size: int, sidecar: bool = False) -> Dict[str, Any]:
+    """Parse a dataset once per (path, mtime, size); callers must treat the result as read-only.
+
+    Entries are keyed by path alone, so an edited file replaces its stale parse instead of
+    sitting next to it until evicted.
+    """
+
+    with _DATASET_CACHE_LOCK:
+        entry = _DATASET_CACHE.get(path)
+        if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+            _DATASET_CACHE.move_to_end(path)
+            return entry[2]
+    data = _parse_dataset(Path(path), mtime_ns, sidecar)
+    with _DATASET_CACHE_LOCK:
+        _DATASET_CACHE[path] = (mtime_ns, size, data)
+        _DATASET_CACHE.move_to_end(path)
+        while len(_DATASET_CACHE) > _DATASET_CACHE_SIZE:
+            _DATASET_CACHE.popitem(last=False)
+    return data
+
+
 class EvaluationRunner:
     """Drive `/api/chat` requests and score results against deterministic expectations."""
 
     def __init__(
         self,
-        dataset_path: Path,
+        dataset: Path | str | Mapping[str, Any],
         *,
         base_url: str = "http://localhost:8000",
         timeout: float = DEFAULT_TIMEOUT,
         client: httpx.Client | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        sidecar_cache: bool | None = None,
     ) -> None:
-        self.dataset_path = Path(dataset_path)
+        # A mapping is an already-parsed dataset (tests, generated sets); anything else is a YAML path.
+        self._inline_dataset: Dict[str, Any] | None = None
+        self.dataset_path: Path | None = None
+        if isinstance(dataset, Mapping):
+            self._inline_dataset = dict(dataset)
+        else:
+            self.dataset_path = Path(dataset)
+        # Persist parsed datasets as JSON next to the YAML; defaults to PKA_EVAL_CACHE=1.
+        self.sidecar_cache = os.environ.get("PKA_EVAL_CACHE") == "1" if sidecar_cache is None else sidecar_cache
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.concurrency = max(1, concurrency)
         self._external_client = client is not None
-        self._client = client or httpx.Client(base_url=self.base_url, timeout=self.timeout)
+        self._client = client or httpx.Client(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=http2_available(),
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+                keepalive_expiry=60.0,
+            ),
+        )
 
     def close(self) -> None:
         """Release HTTP client resources."""
@@ -62,80 +162,36 @@ class EvaluationRunner:
         dataset = self._load_dataset()
         examples = dataset.get("examples", [])
 
-        results: List[Dict[str, Any]] = []
-        latencies: List[int] = []
-        completed = 0
-        failures = 0
+        # Parse expectations up front so a malformed dataset fails before any request is sent.
+        expectations = [ExampleExpectations.from_dict(example.get("expectations")) for example in examples]
 
-        for index, example in enumerate(examples, start=1):
-            question = example.get("question")
-            if not question:
-                results.append(
-                    {
-                        "index": index,
-                        "status": "error",
-                        "issues": ["Missing question field."],
-                    }
-                )
-                failures += 1
-                continue
-
-            mode = example.get("mode", "synthesize")
-            expectations = ExampleExpectations.from_dict(example.get("expectations"))
-
-            try:
-                response = self._client.post("/api/chat", json={"question": question, "mode": mode})
-            except Exception as exc:  # pragma: no cover - transport failure
-                results.append(
-                    {
-                        "index": index,
-                        "question": question,
-                        "mode": mode,
-                        "status": "error",
-                        "issues": [f"Request failed: {exc}"],
-                    }
-                )
-                failures += 1
-                continue
-
-            if response.status_code != 200:
-                results.append(
-                    {
-                        "index": index,
-                        "question": question,
-                        "mode": mode,
-                        "status": "fail",
-                        "issues": [f"HTTP {response.status_code}: {response.text}"],
-                    }
-                )
-                failures += 1
-                continue
-
-            try:
-                payload = response.json()
-            except ValueError as exc:
-                results.append(
-                    {
-                        "index": index,
-                        "question": question,
-                        "mode": mode,
-                        "status": "fail",
-                        "issues": [f"Invalid JSON response: {exc}"],
-                    }
-                )
-                failures += 1
-                continue
+        # Ask each distinct (question, mode) once; chat runs are deterministic (temperature/seed),
+        # so repeated prompts that only vary their expectations reuse the same response.
+        requests = list(
+            dict.fromkeys(
+                (example["question"], example.get("mode", "synthesize"))
+                for example in examples
+                if example.get("question")
+            )
+        )
+        # Requests are independent and LLM-bound, so keep up to `concurrency` of them in flight.
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            responses = dict(zip(requests, pool.map(self._fetch, requests)))
 
-            evaluation = self._evaluate_example(payload, expectations)
-            evaluation.update({"index": index, "question": question, "mode": mode})
-            results.append(evaluation)
+        results = [
+            self._score_example(index, example, expectation, responses)
+            for index, (example, expectation) in enumerate(zip(examples, expectations), start=1)
+        ]
 
-            if evaluation["status"] == "pass":
+        latencies: List[int] = []
+        completed = 0
+        failures = 0
+        for result in results:
+            if result["status"] == "pass":
                 completed += 1
             else:
                 failures += 1
-
-            latency = evaluation.get("latency_ms")
+            latency = result.get("latency_ms")
             if isinstance(latency, int):
                 latencies.append(latency)
 
@@ -147,6 +203,47 @@ class EvaluationRunner:
 
         return report
 
+    def _fetch(self, request: Tuple[str, str]) -> Tuple[Dict[str, Any] | None, Dict[str, Any] | None]:
+        """POST one question; return (payload, None) or (None, failure fields)."""
+
+        question, mode = request
+        try:
+            response = self._client.post(CHAT_PATH, json={"question": question, "mode": mode})
+        except Exception as exc:  # pragma: no cover - transport failure
+            return None, {"status": "error", "issues": [f"Request failed: {exc}"]}
+
+        if response.status_code != 200:
+            # Error pages can be huge; decode only a bounded preview of the body.
+            preview = response.content[:ERROR_PREVIEW_BYTES].decode("utf-8", "replace")
+            return None, {"status": "fail", "issues": [f"HTTP {response.status_code}: {preview}"]}
+
+        try:
+            return json_loads(response.content), None
+        except ValueError as exc:
+            return None, {"status": "fail", "issues": [f"Invalid JSON response: {exc}"]}
+
+    def _score_example(
+        self,
+        index: int,
+        example: Dict[str, Any],
+        expectations: ExampleExpectations,
+        responses: Dict[Tuple[str, str], Tuple[Dict[str, Any] | None, Dict[str, Any] | None]],
+    ) -> Dict[str, Any]:
+        question = example.get("question")
+        if not question:
+            return {
+                "index": index,
+                "status": "error",
+                "issues": ["Missing question field."],
+            }
+
+        mode = example.get("mode", "synthesize")
+        identity = {"index": index, "question": question, "mode": mode}
+        payload, failure = responses[(question, mode)]
+        if failure is not None:
+            return {**identity, **failure}
+        return {**self._evaluate_example(payload, expectations), **identity}
+
     def _evaluate_example(self, payload: Dict[str, Any], expectations: ExampleExpectations) -> Dict[str, Any]:
         issues: List[str] = []
 
@@ -157,18 +254,18 @@ class EvaluationRunner:
         source_ids = {str(item.get("id")) for item in sources if item and item.get("id")}
         source_count = len(source_ids)
 
-        if expectations.require_abstain is not None:
-            observed_abstain = bool(answer.get("abstain"))
-            if observed_abstain != expectations.require_abstain:
-                expectation = "abstain" if expectations.require_abstain else "provide an answer"
-                issues.append(f"Expected model to {expectation}, received abstain={observed_abstain}.")
+        abstain = bool(answer.get("abstain"))
 
-        if not answer.get("abstain"):
+        if expectations.require_abstain is not None and abstain != expectations.require_abstain:
+            expectation = "abstain" if expectations.require_abstain else "provide an answer"
+            issues.append(f"Expected model to {expectation}, received abstain={abstain}.")
+
+        if not abstain:
             if source_count < expectations.min_sources:
                 issues.append(
                     f"Insufficient citations: expected ≥{expectations.min_sources}, found {source_count}."
                 )
-            missing_required = [sid for sid in expectations.required_source_ids if sid not in source_ids]
+            missing_required = sorted(expectations.required_source_ids - source_ids)
             if missing_required:
                 issues.append(f"Missing required citations: {', '.join(missing_required)}.")
 
@@ -184,7 +281,7 @@ class EvaluationRunner:
             "latency_ms": latency_ms,
             "source_count": source_count,
             "issues": issues,
-            "abstain": bool(answer.get("abstain")),
+            "abstain": abstain,
         }
 
     def _summarise(
@@ -202,7 +299,7 @@ class EvaluationRunner:
             "pending": pending,
         }
         if latencies:
-            summary["avg_latency_ms"] = int(statistics.mean(latencies))
+            summary["avg_latency_ms"] = int(statistics.fmean(latencies))
             summary["p95_latency_ms"] = self._percentile(latencies, 95)
         return summary
 
@@ -210,43 +307,51 @@ class EvaluationRunner:
     def _percentile(values: Sequence[int], percentile: int) -> int:
         if not values:
             return 0
-        ordered = sorted(values)
-        if len(ordered) == 1:
-            return ordered[0]
-        rank = (percentile / 100) * (len(ordered) - 1)
+        count = len(values)
+        if count == 1:
+            return values[0]
+        rank = (percentile / 100) * (count - 1)
         lower_index = int(rank)
-        upper_index = min(lower_index + 1, len(ordered) - 1)
+        upper_index = min(lower_index + 1, count - 1)
         weight = rank - lower_index
-        interpolated = ordered[lower_index] * (1 - weight) + ordered[upper_index] * weight
+        # Only the values from lower_index upwards matter; for p95 that is a small heap, not a full sort.
+        # numpy (a dependency elsewhere) is not used: the scorer CLI does not otherwise import it, and
+        # converting a short list of ints to an array costs more than this heap.
+        top = heapq.nlargest(count - lower_index, values)
+        lower = top[-1]
+        upper = top[-2] if upper_index > lower_index else lower
+        interpolated = lower * (1 - weight) + upper * weight
         return int(round(interpolated))
 
     def _load_dataset(self) -> Dict[str, Any]:
-        if not self.dataset_path.exists():
-            raise FileNotFoundError(f"Dataset not found at {self.dataset_path}")
-        return yaml.safe_load(self.dataset_path.read_text(encoding="utf-8")) or {}
+        if self.dataset_path is None:
+            return self._inline_dataset or {}
+        try:
+            stat = self.dataset_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Dataset not found at {self.dataset_path}") from None
+        return _load_yaml_cached(str(self.dataset_path), stat.st_mtime_ns, stat.st_size, self.sidecar_cache)
 
     def _write_markdown_report(self, report_path: Path, report: Dict[str, Any]) -> None:
         summary = report["summary"]
-        lines = [
-            "# Evaluation Report",
-            "",
-            f"- Total examples: {summary.get('total_examples', 0)}",
-            f"- Completed: {summary.get('completed', 0)}",
-            f"- Failed: {summary.get('failed', 0)}",
-            f"- Pending: {summary.get('pending', 0)}",
-        ]
-        if "avg_latency_ms" in summary:
-            lines.append(f"- Average latency: {summary['avg_latency_ms']} ms")
-        if "p95_latency_ms" in summary:
-            lines.append(f"- P95 latency: {summary['p95_latency_ms']} ms")
-        lines.extend(["", "## Result Breakdown"])
-        for result in report["results"]:
-            status = result.get("status", "unknown").upper()
-            question = result.get("question", "Unknown question")
-            lines.append(f"- [{status}] {question}")
-            for issue in result.get("issues") or []:
-                lines.append(f"  - {issue}")
-        report_path.write_text("\n".join(lines), encoding="utf-8")
+        # Written line by line through a large buffer rather than joined into one string.
+        with report_path.open("w", encoding="utf-8", buffering=1 << 20) as handle:
+            handle.write("# Evaluation Report\n\n")
+            handle.write(f"- Total examples: {summary.get('total_examples', 0)}\n")
+            handle.write(f"- Completed: {summary.get('completed', 0)}\n")
+            handle.write(f"- Failed: {summary.get('failed', 0)}\n")
+            handle.write(f"- Pending: {summary.get('pending', 0)}\n")
+            if "avg_latency_ms" in summary:
+                handle.write(f"- Average latency: {summary['avg_latency_ms']} ms\n")
+            if "p95_latency_ms" in summary:
+                handle.write(f"- P95 latency: {summary['p95_latency_ms']} ms\n")
+            handle.write("\n## Result Breakdown\n")
+            for result in report["results"]:
+                status = result.get("status", "unknown").upper()
+                question = result.get("question", "Unknown question")
+                handle.write(f"- [{status}] {question}\n")
+                for issue in result.get("issues") or []:
+                    handle.write(f"  - {issue}\n")
 
 
 def main() -> None:
@@ -263,12 +368,16 @@ def main() -> None:
     parser.add_argument("--json", type=Path, help="Optional path to dump JSON summary.")
     parser.add_argument("--base-url", type=str, default="http://localhost:8000", help="Root URL of the API server.")
     parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="HTTP timeout in seconds.")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum number of in-flight requests."
+    )
     args = parser.parse_args()
 
     runner = EvaluationRunner(
         args.config,
         base_url=args.base_url,
         timeout=args.timeout,
+        concurrency=args.concurrency,
     )
     try:
         report = runner.run(args.report)
@@ -276,7 +385,7 @@ def main() -> None:
         runner.close()
     print(json.dumps(report["summary"], indent=2))
     if args.json:
-        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        args.json.write_bytes(dumps_indented(report))
 
 
 if __name__ == "__main__":
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
 import httpx
 
+from ..core.compat import http2_available
+from ..core.serialization import loads as json_loads
 from ..core.settings import settings
 from ..models.schema import HealthProbe, HealthStatus
 
@@ -15,20 +19,37 @@ logger = logging.getLogger(__name__)
 class ReadinessService:
     """Lightweight readiness checks for the local assistant."""
 
-    def __init__(self) -> None:
-        self._http_client = httpx.Client(timeout=settings.ollama_timeout_seconds)
+    def __init__(self, *, ttl_seconds: float = 5.0) -> None:
+        self._http_client = httpx.Client(
+            timeout=settings.ollama_timeout_seconds,
+            http2=http2_available(),
+            limits=httpx.Limits(max_keepalive_connections=2, keepalive_expiry=60.0),
+        )
+        # Results are reused for a short window so bursts of probes (orchestrator readiness
+        # checks, diagnostics page, health endpoint) hit Ollama once.
+        self._ttl_seconds = ttl_seconds
+        self._cache: Tuple[float, HealthStatus] | None = None
 
     def close(self) -> None:
         self._http_client.close()
 
-    def run_checks(self) -> HealthStatus:
+    def run_checks(self, *, force: bool = False) -> HealthStatus:
+        """Return the readiness status, reusing a result younger than the TTL unless `force` is set."""
+
+        now = time.monotonic()
+        if not force and self._cache is not None and now - self._cache[0] < self._ttl_seconds:
+            return self._cache[1]
         tags_payload, tags_error = self._fetch_tags()
+        # One wall-clock read per check run; every probe in it shares the timestamp.
+        checked_at = datetime.utcnow()
         probes: List[HealthProbe] = [
-            self._check_ollama_daemon(tags_error),
-            self._check_ollama_model(tags_payload, tags_error),
+            self._check_ollama_daemon(tags_error, checked_at),
+            self._check_ollama_model(tags_payload, tags_error, checked_at),
         ]
         status = "pass" if all(probe.healthy for probe in probes) else "fail"
-        return HealthStatus(status=status, probes=probes)
+        result = HealthStatus(status=status, probes=probes)
+        self._cache = (now, result)
+        return result
 
     def _fetch_tags(self) -> Tuple[Dict[str, Any] | None, str | None]:
         url = f"{settings.ollama_base_url.rstrip('/')}/api/tags"
@@ -40,31 +61,42 @@ class ReadinessService:
             logger.debug(detail, exc_info=exc)
             return None, detail
         try:
-            payload: Dict[str, Any] = response.json()
+            payload: Dict[str, Any] = json_loads(response.content)
         except ValueError as exc:
             detail = f"Invalid response from Ollama: {exc!s}"
             logger.debug(detail, exc_info=exc)
             return None, detail
         return payload, None
 
-    def _check_ollama_daemon(self, tags_error: str | None) -> HealthProbe:
+    def _check_ollama_daemon(self, tags_error: str | None, checked_at: datetime) -> HealthProbe:
         if tags_error:
-            return HealthProbe(name="ollama_daemon", healthy=False, detail=tags_error, checked_at=datetime.utcnow())
-        return HealthProbe(name="ollama_daemon", healthy=True, detail="OK", checked_at=datetime.utcnow())
+            return HealthProbe(name="ollama_daemon", healthy=False, detail=tags_error, checked_at=checked_at)
+        return HealthProbe(name="ollama_daemon", healthy=True, detail="OK", checked_at=checked_at)
 
     def _check_ollama_model(
-        self, payload: Dict[str, Any] | None, tags_error: str | None
+        self, payload: Dict[str, Any] | None, tags_error: str | None, checked_at: datetime
     ) -> HealthProbe:
         if tags_error:
-            return HealthProbe(name="ollama_chat_model", healthy=False, detail=tags_error, checked_at=datetime.utcnow())
+            return HealthProbe(name="ollama_chat_model", healthy=False, detail=tags_error, checked_at=checked_at)
         required = settings.ollama_chat_model
-        models = {model.get("name") or model.get("model") for model in (payload or {}).get("models", [])}
-        normalized = {item for item in models if item}
-        normalized.update({item.split(":", 1)[0] for item in normalized if ":" in item})
+        normalized: set[str] = set()
+        for model in (payload or {}).get("models", []):
+            name = model.get("name") or model.get("model")
+            if name:
+                # Accept both the tagged name and its bare form ("llama3.1:8b" and "llama3.1").
+                normalized.add(name)
+                normalized.add(name.split(":", 1)[0])
         if required not in normalized:
             detail = f"Missing model: {required}"
-            return HealthProbe(name="ollama_chat_model", healthy=False, detail=detail, checked_at=datetime.utcnow())
-        return HealthProbe(name="ollama_chat_model", healthy=True, detail="OK", checked_at=datetime.utcnow())
+            return HealthProbe(name="ollama_chat_model", healthy=False, detail=detail, checked_at=checked_at)
+        return HealthProbe(name="ollama_chat_model", healthy=True, detail="OK", checked_at=checked_at)
+
+
+@lru_cache(maxsize=1)
+def shared_readiness_service() -> ReadinessService:
+    """Return the process-wide readiness service; call `cache_clear()` after closing it."""
+
+    return ReadinessService()
 
 
-__all__ = ["ReadinessService"]
+__all__ = ["ReadinessService", "shared_readiness_service"]
@@ -1,7 +1,7 @@
 """Index services package."""
 
-from .bm25 import BM25IndexService
+from .bm25 import BM25Hit, BM25IndexService
 from .embed import EmbeddingService
 from .vector import VectorIndexService
 
-__all__ = ["BM25IndexService", "EmbeddingService", "VectorIndexService"]
+__all__ = ["BM25Hit", "BM25IndexService", "EmbeddingService", "VectorIndexService"]
@@ -1,28 +1,155 @@
 from __future__ import annotations
 
-import json
 import logging
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 try:
     import tantivy
 except ImportError as exc:  # pragma: no cover - optional dependency
     raise ImportError("tantivy is required for BM25 index operations") from exc
 
+from ...core.serialization import dumps as json_dumps, loads as json_loads
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class BM25Hit:
+    """One stored chunk returned by a BM25 search."""
+
+    chunk_id: Optional[str]
+    document_id: Optional[str]
+    path: str
+    title: str
+    content: str
+    start_line: int
+    end_line: int
+    score_bm25: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
 class BM25IndexService:
     """Manage a Tantivy index providing BM25 ranking over chunks."""
 
-    def __init__(self, index_path: Path) -> None:
+    def __init__(self, index_path: Path, *, writer_heap_size: int = 128_000_000) -> None:
         self.index_path = index_path
         self.index_path.mkdir(parents=True, exist_ok=True)
         self.schema = self._build_schema()
         self.index = self._open_or_create_index()
         self.search_fields = ["title", "content"]
+        self.writer_heap_size = writer_heap_size
+        # The writer (and Tantivy's index lock) is held only while writing: it is released after
+        # every commit or rollback, and in bulk mode kept until `flush()`.
+        self._writer: "tantivy.IndexWriter | None" = None
+        self._write_lock = threading.Lock()
+        self._bulk = False
+        self._pending = False
+        # Write operations applied since the last commit in bulk mode, replayed after a rollback.
+        self._staged: List[List[tuple]] = []
+
+    def close(self) -> None:
+        """Wait for background merges and release the index writer lock."""
+
+        with self._write_lock:
+            self._release_writer()
+
+    def optimize(self) -> int:
+        """Commit pending writes, wait for segment merges, drop obsolete files; return the segment count.
+
+        tantivy-py exposes no forced-merge call, so this settles whatever the default merge
+        policy scheduled. Run it after a bulk ingest, before shipping the index directory.
+        """
+
+        with self._write_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                if self._pending:
+                    writer.commit()
+                    self._pending = False
+                    self._staged.clear()
+                writer.wait_merging_threads()
+            writer = self.index.writer(heap_size=self.writer_heap_size)
+            writer.garbage_collect_files()
+            writer.wait_merging_threads()
+            self.index.reload()
+        return self.index.searcher().num_segments
+
+    def begin_bulk(self) -> None:
+        """Defer commits until `flush()` so a whole ingest run lands in a single commit."""
+
+        with self._write_lock:
+            self._bulk = True
+            self._staged.clear()
+
+    def flush(self) -> None:
+        """Commit and reload once for everything written since `begin_bulk()`, then leave bulk mode."""
+
+        with self._write_lock:
+            self._bulk = False
+            if self._pending and self._writer is not None:
+                self._commit(self._writer)
+            self._release_writer()
+
+    def _get_writer(self) -> "tantivy.IndexWriter":
+        if self._writer is None:
+            self._writer = self.index.writer(heap_size=self.writer_heap_size)
+        return self._writer
+
+    def _commit(self, writer: "tantivy.IndexWriter") -> None:
+        if self._bulk:
+            self._pending = True
+            return
+        writer.commit()
+        self._release_writer()
+        self.index.reload()
+        self._pending = False
+        self._staged.clear()
+
+    def _abort(self, writer: "tantivy.IndexWriter") -> None:
+        writer.rollback()
+        if not self._bulk:
+            self._release_writer()
+            return
+        # The rollback also discarded the other writes of this bulk run; apply them again so
+        # only the failed call's partial deletes/adds are lost.
+        for ops in self._staged:
+            self._apply(writer, ops)
+
+    def _write(self, ops: List[tuple]) -> None:
+        """Apply one call's operations and commit them (or stage them, in bulk mode) as a unit."""
+
+        with self._write_lock:
+            writer = self._get_writer()
+            try:
+                self._apply(writer, ops)
+            except Exception:
+                self._abort(writer)
+                raise
+            if self._bulk:
+                self._staged.append(ops)
+            self._commit(writer)
+
+    @staticmethod
+    def _apply(writer: "tantivy.IndexWriter", ops: Sequence[tuple]) -> None:
+        delete_by_term = writer.delete_documents_by_term
+        add_document = writer.add_document
+        for op, value in ops:
+            if op == "add":
+                add_document(value)
+            elif op == "delete":
+                delete_by_term("chunk_id", value)
+            else:
+                writer.delete_all_documents()
+
+    def _release_writer(self) -> None:
+        """Finish background merges and drop the writer, freeing the index lock for other processes."""
+
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.wait_merging_threads()
 
     def _build_schema(self) -> "tantivy.Schema":
         builder = tantivy.SchemaBuilder()
@@ -47,94 +174,63 @@ class BM25IndexService:
     def add_documents(self, documents: Sequence[dict]) -> None:
         if not documents:
             return
-        writer = self.index.writer()
-        try:
-            for payload in documents:
-                chunk_id = str(payload["chunk_id"])
-                writer.delete_documents_by_term("chunk_id", chunk_id)
-                document = tantivy.Document.from_dict(
-                    {
-                        "chunk_id": [chunk_id],
-                        "document_id": [str(payload["document_id"])],
-                        "path": [str(payload.get("path", ""))],
-                        "title": [payload.get("title", "")],
-                        "content": [payload.get("content", "")],
-                        "metadata": [json.dumps(payload.get("metadata", {}))],
-                        "start_line": [int(payload.get("start_line") or 0)],
-                        "end_line": [int(payload.get("end_line") or 0)],
-                    }
-                )
-                writer.add_document(document)
-            writer.commit()
-        finally:
-            writer = None  # release index lock
-        self.index.reload()
+        # Build every Document before taking the writer so the lock only covers the index calls.
+        ops: List[tuple] = []
+        for payload in documents:
+            ops.append(("delete", str(payload["chunk_id"])))
+            ops.append(("add", self._to_document(payload)))
+        self._write(ops)
 
     def bulk_replace(self, documents: Iterable[dict]) -> None:
-        writer = self.index.writer()
-        try:
-            writer.delete_all_documents()
-            for payload in documents:
-                document = tantivy.Document.from_dict(
-                    {
-                        "chunk_id": [str(payload["chunk_id"])],
-                        "document_id": [str(payload["document_id"])],
-                        "path": [str(payload.get("path", ""))],
-                        "title": [payload.get("title", "")],
-                        "content": [payload.get("content", "")],
-                        "metadata": [json.dumps(payload.get("metadata", {}))],
-                        "start_line": [int(payload.get("start_line") or 0)],
-                        "end_line": [int(payload.get("end_line") or 0)],
-                    }
-                )
-                writer.add_document(document)
-            writer.commit()
-        finally:
-            writer = None
-        self.index.reload()
+        self._write([("clear", None), *(("add", self._to_document(payload)) for payload in documents)])
+
+    @staticmethod
+    def _to_document(payload: dict) -> "tantivy.Document":
+        return tantivy.Document.from_dict(
+            {
+                "chunk_id": [str(payload["chunk_id"])],
+                "document_id": [str(payload["document_id"])],
+                "path": [str(payload.get("path", ""))],
+                "title": [payload.get("title", "")],
+                "content": [payload.get("content", "")],
+                "metadata": [json_dumps(payload.get("metadata", {}))],
+                "start_line": [int(payload.get("start_line") or 0)],
+                "end_line": [int(payload.get("end_line") or 0)],
+            }
+        )
 
     def remove_chunks(self, chunk_ids: Sequence[int]) -> None:
         if not chunk_ids:
             return
-        writer = self.index.writer()
-        try:
-            for chunk_id in chunk_ids:
-                writer.delete_documents_by_term("chunk_id", str(chunk_id))
-            writer.commit()
-        finally:
-            writer = None
-        self.index.reload()
+        self._write([("delete", str(chunk_id)) for chunk_id in chunk_ids])
 
-    def search(self, query: str, limit: int = 50) -> List[dict]:
+    def search(self, query: str, limit: int = 50) -> List[BM25Hit]:
         query = query.strip()
         if not query:
             return []
         tantivy_query = self.index.parse_query(query, self.search_fields)
         searcher = self.index.searcher()
         result = searcher.search(tantivy_query, limit)
-        hits: List[dict] = []
+        hits: List[BM25Hit] = []
         for score, address in result.hits:
             stored = searcher.doc(address).to_dict()
             hits.append(
-                {
-                    "chunk_id": stored.get("chunk_id", [None])[0],
-                    "document_id": stored.get("document_id", [None])[0],
-                    "path": stored.get("path", [""])[0],
-                    "title": stored.get("title", [""])[0],
-                    "content": stored.get("content", [""])[0],
-                    "metadata": json.loads(stored.get("metadata", ["{}"])[0] or "{}"),
-                    "start_line": stored.get("start_line", [0])[0],
-                    "end_line": stored.get("end_line", [0])[0],
-                    "score_bm25": float(score),
-                }
+                BM25Hit(
+                    chunk_id=stored.get("chunk_id", [None])[0],
+                    document_id=stored.get("document_id", [None])[0],
+                    path=stored.get("path", [""])[0],
+                    title=stored.get("title", [""])[0],
+                    content=stored.get("content", [""])[0],
+                    start_line=stored.get("start_line", [0])[0],
+                    end_line=stored.get("end_line", [0])[0],
+                    score_bm25=float(score),
+                    metadata=json_loads(stored.get("metadata", ["{}"])[0] or "{}"),
+                )
             )
         return hits
 
     def clear(self) -> None:
-        writer = self.index.writer()
-        try:
-            writer.delete_all_documents()
-            writer.commit()
-        finally:
-            writer = None
-        self.index.reload()
+        self._write([("clear", None)])
+
+
+__all__ = ["BM25Hit", "BM25IndexService"]
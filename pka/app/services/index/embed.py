@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable, List, Sequence
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
 
 import httpx
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import numpy as np
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential, wait_random
 
+from ...core.compat import http2_available
+from ...core.serialization import loads as json_loads
 from ...core.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -25,57 +31,78 @@ class EmbeddingService:
         timeout: int = 60,
         batch_size: int = 16,
         expected_dim: int | None = None,
+        concurrency: int = 4,
+        query_cache_size: int = 2048,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
         self.batch_size = max(1, batch_size)
         self.expected_dim = expected_dim or settings.vector_dim
-        self._client = httpx.Client(base_url=self.base_url, timeout=self.timeout)
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=http2_available(),
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60.0),
+        )
+        # Keeps several batches in flight so Ollama is never idle waiting on the next request.
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="embed")
+        # Flipped when the server predates the batch /api/embed endpoint.
+        self._legacy_endpoint = False
+        # LRU of recent query vectors; repeated questions skip the Ollama round trip.
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = max(0, query_cache_size)
+        self._query_cache_lock = threading.Lock()
 
     def close(self) -> None:
+        self._executor.shutdown(wait=True)
         self._client.close()
 
-    def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
-        """Return embeddings for the given texts."""
+    def embed_texts(self, texts: Iterable[str]) -> np.ndarray:
+        """Return a (len(texts), expected_dim) float32 array of embeddings."""
 
         inputs = [text for text in texts]
         if not inputs:
-            return []
+            return np.empty((0, self.expected_dim), dtype=np.float32)
 
-        vectors: List[List[float]] = []
-        for offset in range(0, len(inputs), self.batch_size):
-            batch = inputs[offset : offset + self.batch_size]
-            vectors.extend(self._embed_batch(batch))
+        batches = [inputs[offset : offset + self.batch_size] for offset in range(0, len(inputs), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        # map() keeps batch order; each batch keeps its own tenacity retry.
+        return np.concatenate(list(self._executor.map(self._embed_batch, batches)))
 
-        return vectors
+    def embed_query(self, query: str) -> np.ndarray:
+        """Return embedding for a single query string (read-only; cached per exact query)."""
 
-    def embed_query(self, query: str) -> Sequence[float]:
-        """Return embedding for a single query string."""
+        with self._query_cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+                return vector
 
         [vector] = self.embed_texts([query])
+        vector.flags.writeable = False
+        if self._query_cache_size:
+            with self._query_cache_lock:
+                self._query_cache[query] = vector
+                self._query_cache.move_to_end(query)
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
         return vector
 
     @retry(
         retry=retry_if_exception_type(EmbeddingServiceError),
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=4),
+        # Jitter keeps concurrently failing batches from retrying in lockstep (e.g. after a 429).
+        wait=wait_exponential(multiplier=1, min=1, max=4) + wait_random(0, 0.5),
         reraise=True,
     )
-    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+    def _embed_batch(self, batch: List[str]) -> np.ndarray:
         if not batch:
-            return []
-
-        payload = {
-            "model": self.model,
-            # Always send a list so Ollama returns a deterministic embeddings array.
-            "input": list(batch),
-        }
+            return np.empty((0, self.expected_dim), dtype=np.float32)
 
         try:
-            response = self._client.post("/api/embed", json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request_legacy(batch) if self._legacy_endpoint else self._request_batch(batch)
         except httpx.TimeoutException as exc:
             logger.debug("Embedding request timed out: %s", exc, exc_info=exc)
             raise EmbeddingServiceError("Ollama embedding request timed out.") from exc
@@ -104,17 +131,17 @@ class EmbeddingService:
         if raw_embeddings is None:
             raise EmbeddingServiceError("Unexpected embedding payload format.")
 
-        vectors: List[List[float]] = []
-        for vector in raw_embeddings:
-            try:
-                floats = [float(value) for value in vector]
-            except (TypeError, ValueError) as exc:
-                raise EmbeddingServiceError("Embedding contains non-numeric values.") from exc
-            if self.expected_dim and len(floats) != self.expected_dim:
-                raise EmbeddingServiceError(
-                    f"Embedding dimension mismatch: expected {self.expected_dim}, got {len(floats)}"
-                )
-            vectors.append(floats)
+        # One C-level conversion for the whole batch; pgvector stores float32 anyway.
+        try:
+            vectors = np.asarray(raw_embeddings, dtype=np.float32)
+        except (TypeError, ValueError) as exc:
+            raise EmbeddingServiceError("Embedding contains non-numeric or ragged values.") from exc
+        if vectors.ndim != 2:
+            raise EmbeddingServiceError(f"Unexpected embedding array shape {vectors.shape}.")
+        if self.expected_dim and vectors.shape[1] != self.expected_dim:
+            raise EmbeddingServiceError(
+                f"Embedding dimension mismatch: expected {self.expected_dim}, got {vectors.shape[1]}"
+            )
 
         if len(vectors) != len(batch):
             raise EmbeddingServiceError(
@@ -123,5 +150,27 @@ class EmbeddingService:
 
         return vectors
 
+    def _request_batch(self, batch: List[str]) -> dict:
+        payload = {
+            "model": self.model,
+            # Always send a list so Ollama returns a deterministic embeddings array.
+            "input": list(batch),
+        }
+        response = self._client.post("/api/embed", json=payload)
+        if response.status_code == httpx.codes.NOT_FOUND:
+            logger.info("Ollama has no /api/embed; falling back to per-text /api/embeddings")
+            self._legacy_endpoint = True
+            return self._request_legacy(batch)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+    def _request_legacy(self, batch: List[str]) -> dict:
+        embeddings: List[List[float]] = []
+        for text in batch:
+            response = self._client.post("/api/embeddings", json={"model": self.model, "prompt": text})
+            response.raise_for_status()
+            embeddings.append(json_loads(response.content).get("embedding"))
+        return {"embeddings": embeddings}
+
 
 __all__ = ["EmbeddingService", "EmbeddingServiceError"]
@@ -3,9 +3,10 @@ from __future__ import annotations
 import logging
 from typing import List, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from ...core.settings import settings
 from ...models.db import Chunk, Document
 
 logger = logging.getLogger(__name__)
@@ -14,13 +15,14 @@ logger = logging.getLogger(__name__)
 class VectorIndexService:
     """Perform pgvector similarity searches over chunk embeddings."""
 
-    def __init__(self, distance_metric: str = "cosine") -> None:
+    def __init__(self, distance_metric: str = "cosine", probes: int | None = None) -> None:
         if distance_metric not in {"cosine", "l2"}:
             raise ValueError("distance_metric must be 'cosine' or 'l2'")
         self.distance_metric = distance_metric
+        self.probes = probes or settings.vector_probes
 
     def search(self, session: Session, query_vector: Sequence[float], limit: int = 50) -> List[dict]:
-        if not query_vector:
+        if len(query_vector) == 0:
             return []
 
         comparator = (
@@ -28,30 +30,43 @@ class VectorIndexService:
             if self.distance_metric == "cosine"
             else Chunk.embedding.l2_distance(query_vector)
         )
-        stmt = (
-            select(
-                Chunk.id.label("chunk_id"),
-                Chunk.document_id,
-                Chunk.text,
-                Chunk.start_line,
-                Chunk.end_line,
-                Chunk.page_no,
-                Chunk.token_count,
-                Document.title,
-                Document.path,
-                Document.type,
-                comparator.label("distance"),
-            )
-            .join(Document, Document.id == Chunk.document_id)
+        # Transaction-scoped probe count for the ivfflat index; set_config accepts bound parameters.
+        session.execute(select(func.set_config("ivfflat.probes", str(self.probes), True)))
+        # Rank over the chunks table alone so the planner can use the ANN index, then hydrate the top-K.
+        ranked = session.execute(
+            select(Chunk.id, comparator.label("distance"))
             .where(Chunk.embedding.is_not(None))
             .order_by(comparator)
             .limit(limit)
-        )
+        ).all()
+        if not ranked:
+            return []
+        details = {
+            row.chunk_id: row
+            for row in session.execute(
+                select(
+                    Chunk.id.label("chunk_id"),
+                    Chunk.document_id,
+                    Chunk.text,
+                    Chunk.start_line,
+                    Chunk.end_line,
+                    Chunk.page_no,
+                    Chunk.token_count,
+                    Document.title,
+                    Document.path,
+                    Document.type,
+                )
+                .join(Document, Document.id == Chunk.document_id)
+                .where(Chunk.id.in_([chunk_id for chunk_id, _ in ranked]))
+            )
+        }
 
-        rows = session.execute(stmt).all()
         results: List[dict] = []
-        for row in rows:
-            distance = float(row.distance) if row.distance is not None else None
+        for chunk_id, raw_distance in ranked:
+            row = details.get(chunk_id)
+            if row is None:
+                continue
+            distance = float(raw_distance) if raw_distance is not None else None
             score = None if distance is None else 1.0 - distance if self.distance_metric == "cosine" else -distance
             results.append(
                 {
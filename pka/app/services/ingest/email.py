@@ -2,17 +2,21 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from email import policy
 from email.message import EmailMessage
 from email.parser import BytesParser
+from itertools import accumulate
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Sequence
 
-from ...models.db import Chunk, Document, session_scope
+from ...models.db import Document, bulk_insert_chunks, delete_document_chunks, session_scope, stored_checksum
 from ..index.bm25 import BM25IndexService
 from ..index.embed import EmbeddingService
+from .pipeline import run_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +26,32 @@ class EmailChunkDraft:
     text: str
     subject: str
     sent_at: Optional[str]
+    token_count: int = 0
+
+
+@dataclass
+class PreparedEmail:
+    path: Path
+    abs_path: str
+    checksum: str
+    size: int
+    metadata: dict
+    chunks: List[EmailChunkDraft]
 
 
 class EmailIngestService:
     """Ingest .eml email exports, chunk, embed, and persist to storage."""
 
-    quote_pattern = re.compile(r"^On .*wrote:$", flags=re.IGNORECASE)
+    # A quoted block starts at a "> ..." or "On ... wrote:" line and runs up to and including
+    # the next blank line (or the end of the body).
+    quote_block_pattern = re.compile(
+        r"^[^\S\n]*(?:>|On .*wrote:[^\S\n]*$)[^\n]*(?:\n|\Z)"
+        r"(?:[^\S\n]*\S[^\n]*(?:\n|\Z))*"
+        r"(?:[^\S\n]*(?:\n|\Z))?",
+        flags=re.MULTILINE | re.IGNORECASE,
+    )
+    # Runs of non-empty lines, i.e. the pieces between "\n\n" separators.
+    paragraph_pattern = re.compile(r"[^\n]+(?:\n(?!\n)[^\n]+)*")
 
     def __init__(
         self,
@@ -37,12 +61,17 @@ class EmailIngestService:
         *,
         max_tokens: int = 700,
         overlap_ratio: float = 0.15,
+        embed_window: int = 256,
+        prepare_workers: int = 2,
     ) -> None:
         self.source_dir = source_dir
         self.embedding_service = embedding_service
         self.bm25_service = bm25_service
         self.max_tokens = max_tokens
         self.overlap_ratio = overlap_ratio
+        # Chunks from consecutive emails are embedded together, up to this many per call.
+        self.embed_window = max(1, embed_window)
+        self.prepare_workers = prepare_workers
 
     def discover(self) -> List[Path]:
         files = list(self.source_dir.glob("**/*.eml"))
@@ -57,19 +86,50 @@ class EmailIngestService:
         if limit is not None:
             files = files[:limit]
         logger.info("Processing %d email files.", len(files))
+        eml_files: List[Path] = []
         for path in files:
             if path.suffix.lower() != ".eml":
                 logger.info("Skipping non-EML file %s; mbox ingestion pending.", path)
                 continue
-            try:
-                self._ingest_eml(path)
-            except Exception as exc:  # pragma: no cover
-                logger.exception("Failed to ingest email %s: %s", path, exc)
+            eml_files.append(path)
+        # One BM25 commit for the whole run instead of one per email.
+        self.bm25_service.begin_bulk()
+        try:
+            run_pipeline(
+                eml_files,
+                self._prepare_eml,
+                self._chunk_texts,
+                self.embedding_service.embed_texts,
+                self._store_eml,
+                self._log_failure,
+                prepare_workers=self.prepare_workers,
+                embed_window=self.embed_window,
+            )
+        finally:
+            self.bm25_service.flush()
 
-    def _ingest_eml(self, path: Path) -> None:
-        raw = path.read_bytes()
-        checksum = hashlib.sha256(raw).hexdigest()
-        message = BytesParser(policy=policy.default).parsebytes(raw)
+    @staticmethod
+    def _log_failure(path: Path, exc: Exception) -> None:  # pragma: no cover
+        logger.exception("Failed to ingest email %s: %s", path, exc, exc_info=exc)
+
+    @staticmethod
+    def _chunk_texts(prepared: PreparedEmail) -> List[str]:
+        return [chunk.text for chunk in prepared.chunks]
+
+    def _prepare_eml(self, path: Path) -> PreparedEmail | None:
+        """Hash, parse, and chunk one email; returns None when there is nothing to (re)index."""
+
+        abs_path = str(path.resolve())
+        # Hash and parse straight from the file so large exports are never held as one bytes buffer.
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            checksum = hashlib.file_digest(handle, "sha256").hexdigest()
+            # Unchanged emails are skipped before any parsing, chunking, or embedding work.
+            if stored_checksum(abs_path) == checksum:
+                logger.info("Skipping unchanged email %s", path)
+                return None
+            handle.seek(0)
+            message = BytesParser(policy=policy.default).parse(handle)
 
         metadata = {
             "from": message.get("from"),
@@ -82,20 +142,21 @@ class EmailIngestService:
         body = self._extract_body(message)
         if not body.strip():
             logger.warning("Email %s has no textual body; skipping.", path)
-            return
+            return None
 
         cleaned_body = self._strip_quotes(body)
         chunks = self._chunk_text(cleaned_body, metadata["subject"], metadata["date"])
         if not chunks:
             logger.warning("No chunks produced for email %s; skipping.", path)
-            return
-
-        embeddings = self.embedding_service.embed_texts(chunk.text for chunk in chunks)
-        if len(embeddings) != len(chunks):
-            raise RuntimeError("Embedding count mismatch during email ingestion.")
+            return None
+        return PreparedEmail(
+            path=path, abs_path=abs_path, checksum=checksum, size=size, metadata=metadata, chunks=chunks
+        )
 
+    def _store_eml(self, prepared: PreparedEmail, embeddings: Sequence[Sequence[float]]) -> None:
+        path, abs_path, checksum, size = prepared.path, prepared.abs_path, prepared.checksum, prepared.size
+        metadata, chunks = prepared.metadata, prepared.chunks
         with session_scope() as session:
-            abs_path = str(path.resolve())
             existing: Document | None = session.query(Document).filter_by(path=abs_path).one_or_none()
             removed_chunk_ids: List[int] = []
             if existing and existing.sha256 == checksum:
@@ -108,47 +169,46 @@ class EmailIngestService:
                     title=metadata["subject"] or path.stem.replace("_", " ").title(),
                     type="email",
                     sha256=checksum,
-                    size=len(raw),
+                    size=size,
                     meta={k: v for k, v in metadata.items() if v},
                 )
                 session.add(document)
                 session.flush()
             else:
                 document = existing
-                removed_chunk_ids = [chunk.id for chunk in list(document.chunks)]
+                removed_chunk_ids = delete_document_chunks(session, document.id)
                 document.title = metadata["subject"] or document.title
                 document.sha256 = checksum
-                document.size = len(raw)
+                document.size = size
                 document.meta = {k: v for k, v in metadata.items() if v}
-                document.chunks.clear()
                 session.flush()
 
-            chunk_payloads: List[dict] = []
-            for ordinal, (chunk_draft, embedding) in enumerate(zip(chunks, embeddings), start=1):
-                chunk_model = Chunk(
-                    document_id=document.id,
-                    ordinal=ordinal,
-                    text=chunk_draft.text,
-                    start_line=None,
-                    end_line=None,
-                    page_no=None,
-                    token_count=self._count_tokens(chunk_draft.text),
-                    embedding=embedding,
-                )
-                session.add(chunk_model)
-                session.flush()
-                chunk_payloads.append(
+            chunk_ids = bulk_insert_chunks(
+                session,
+                document.id,
+                [
                     {
-                        "chunk_id": chunk_model.id,
-                        "document_id": document.id,
-                        "path": document.path,
-                        "title": document.title,
-                        "content": chunk_draft.text,
-                        "metadata": document.meta,
-                        "start_line": None,
-                        "end_line": None,
+                        "ordinal": ordinal,
+                        "text": chunk_draft.text,
+                        "token_count": chunk_draft.token_count,
+                        "embedding": embedding,
                     }
-                )
+                    for ordinal, (chunk_draft, embedding) in enumerate(zip(chunks, embeddings), start=1)
+                ],
+            )
+            chunk_payloads: List[dict] = [
+                {
+                    "chunk_id": chunk_id,
+                    "document_id": document.id,
+                    "path": document.path,
+                    "title": document.title,
+                    "content": chunk_draft.text,
+                    "metadata": document.meta,
+                    "start_line": None,
+                    "end_line": None,
+                }
+                for chunk_id, chunk_draft in zip(chunk_ids, chunks)
+            ]
 
         if removed_chunk_ids:
             self.bm25_service.remove_chunks(removed_chunk_ids)
@@ -157,75 +217,59 @@ class EmailIngestService:
 
     def _extract_body(self, message: EmailMessage) -> str:
         if message.is_multipart():
-            parts = []
+            # One walk: decode every text/plain part, and remember (undecoded) the first text/*
+            # part as the fallback for messages without a plain-text alternative.
+            parts: List[str] = []
+            fallback: EmailMessage | None = None
             for part in message.walk():
                 content_type = part.get_content_type()
                 if content_type == "text/plain":
                     parts.append(part.get_content())
+                elif fallback is None and content_type.startswith("text/"):
+                    fallback = part
             if parts:
                 return "\n".join(parts)
-            # fallback to first text/* part
-            for part in message.walk():
-                if part.get_content_type().startswith("text/"):
-                    return part.get_content()
-            return ""
+            return fallback.get_content() if fallback is not None else ""
         if message.get_content_type().startswith("text/"):
             return message.get_content()
         return ""
 
     def _strip_quotes(self, body: str) -> str:
-        lines = body.splitlines()
-        cleaned: List[str] = []
-        skip_block = False
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith(">") or self.quote_pattern.match(stripped):
-                skip_block = True
-            if skip_block and not stripped:
-                skip_block = False
-                continue
-            if skip_block:
-                continue
-            cleaned.append(line)
-        return "\n".join(cleaned).strip()
+        normalised = "\n".join(body.splitlines())
+        return self.quote_block_pattern.sub("", normalised).strip()
 
     def _chunk_text(self, body: str, subject: Optional[str], sent_at: Optional[str]) -> List[EmailChunkDraft]:
-        paragraphs = [paragraph.strip() for paragraph in body.split("\n\n") if paragraph.strip()]
+        paragraphs = [text for match in self.paragraph_pattern.finditer(body) if (text := match.group().strip())]
         chunks: List[EmailChunkDraft] = []
         max_tokens = self.max_tokens
         overlap_tokens = max(1, int(max_tokens * self.overlap_ratio))
-        tokenised_paragraphs = [self._count_tokens(paragraph) for paragraph in paragraphs]
+        # prefix[i] is the token count of paragraphs[:i], so cuts are found by bisection.
+        prefix = [0, *accumulate(self._count_tokens(paragraph) for paragraph in paragraphs)]
+        total = len(paragraphs)
         cursor = 0
-        while cursor < len(paragraphs):
-            token_sum = 0
-            end = cursor
-            while end < len(paragraphs) and token_sum < max_tokens:
-                token_sum += tokenised_paragraphs[end]
-                end += 1
+        while cursor < total:
+            # First end past cursor whose span reaches max_tokens (the span always takes one paragraph).
+            end = min(bisect_left(prefix, prefix[cursor] + max_tokens, cursor + 1, total + 1), total)
             chunk_text = "\n\n".join(paragraphs[cursor:end]).strip()
             if chunk_text:
-                chunks.append(EmailChunkDraft(text=chunk_text, subject=subject or "", sent_at=sent_at))
-            if end >= len(paragraphs):
+                chunks.append(
+                    EmailChunkDraft(
+                        text=chunk_text,
+                        subject=subject or "",
+                        sent_at=sent_at,
+                        token_count=prefix[end] - prefix[cursor],
+                    )
+                )
+            if end >= total:
                 break
-            overlap_lines = self._compute_overlap(tokenised_paragraphs[cursor:end], overlap_tokens)
-            next_cursor = end - overlap_lines
+            # Latest start whose tail span [start, end) still covers overlap_tokens.
+            next_cursor = bisect_right(prefix, prefix[end] - overlap_tokens, cursor, end) - 1
             cursor = max(cursor + 1, next_cursor)
         return chunks
 
     @staticmethod
     def _count_tokens(text: str) -> int:
-        stripped = text.strip()
-        return len(stripped.split()) if stripped else 0
-
-    @staticmethod
-    def _compute_overlap(tokens_segment: List[int], overlap_tokens: int) -> int:
-        accumulated = 0
-        lines = 0
-        for count in reversed(tokens_segment):
-            accumulated += count
-            lines += 1
-            if accumulated >= overlap_tokens:
-                break
-        return lines
+        # split() drops surrounding whitespace itself, so blank text counts as 0 without a strip.
+        return len(text.split())
 
 
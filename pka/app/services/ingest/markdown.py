@@ -3,19 +3,39 @@ from __future__ import annotations
 import hashlib
 import logging
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import partial
+from itertools import accumulate
 from pathlib import Path
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Sequence
 
 import frontmatter
+import yaml
+from frontmatter.default_handlers import YAMLHandler
 
-from ...models.db import Chunk, Document, session_scope
+from ...models.db import BatchedSession, Document, bulk_insert_chunks, delete_document_chunks, stored_checksum
 from ..index.bm25 import BM25IndexService
 from ..index.embed import EmbeddingService
+from .pipeline import run_pipeline
 
 logger = logging.getLogger(__name__)
 
 
+class _LibYAMLHandler(YAMLHandler):
+    """YAMLHandler that parses with libyaml's CSafeLoader when PyYAML was built with it."""
+
+    def load(self, fm: str, **kwargs: object) -> object:
+        kwargs.setdefault("Loader", getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        return super().load(fm, **kwargs)
+
+
+# frontmatter's default handlers with the YAML one swapped for the libyaml-backed parser.
+_FRONTMATTER_HANDLERS = [
+    _LibYAMLHandler() if isinstance(handler, YAMLHandler) else handler for handler in frontmatter.handlers
+]
+
+
 @dataclass
 class Section:
     title: str
@@ -31,10 +51,18 @@ class ChunkPayload:
     token_count: int
 
 
+@dataclass
+class PreparedMarkdown:
+    path_str: str
+    document_data: dict
+    chunks: List[ChunkPayload]
+
+
 class MarkdownIngestService:
     """Ingest Markdown sources, chunk, embed, and persist to the vector store."""
 
-    heading_pattern = re.compile(r"^(#{1,2})\s+(.+?)\s*$")
+    # Applied to "\n"-joined lines in MULTILINE mode, so whitespace classes must not cross lines.
+    heading_pattern = re.compile(r"^(#{1,2})[^\S\n]+([^\n]+?)[^\S\n]*$", re.MULTILINE)
 
     def __init__(
         self,
@@ -43,12 +71,20 @@ class MarkdownIngestService:
         bm25_service: BM25IndexService,
         max_tokens: int = 800,
         overlap_ratio: float = 0.12,
+        prepare_workers: int = 2,
+        embed_window: int = 64,
+        commit_batch: int = 50,
     ) -> None:
         self.source_dir = source_dir
         self.embedding_service = embedding_service
         self.bm25_service = bm25_service
         self.max_tokens = max_tokens
         self.overlap_ratio = overlap_ratio
+        self.prepare_workers = prepare_workers
+        # Chunks of consecutive files are packed into embedding calls of about this many texts.
+        self.embed_window = embed_window
+        # Files written per database transaction when ingesting in bulk.
+        self.commit_batch = commit_batch
 
     def discover(self) -> List[Path]:
         """Return a deterministic list of markdown files under the source directory."""
@@ -58,42 +94,76 @@ class MarkdownIngestService:
             return []
         return sorted(self.source_dir.glob("**/*.md"))
 
-    def ingest(self, limit: Optional[int] = None) -> None:
-        """Process markdown files and store their chunks with embeddings."""
+    def ingest(self, limit: Optional[int] = None, *, bulk: bool = True) -> None:
+        """Process markdown files and store their chunks with embeddings.
+
+        With `bulk`, files are committed `commit_batch` at a time instead of one transaction each.
+        """
 
         files = self.discover()
         if limit:
             files = files[:limit]
 
         logger.info("Discovered %d markdown files for ingestion", len(files))
-        for path in files:
+        batch = BatchedSession(self.commit_batch if bulk else 1)
+        # One BM25 commit for the whole run instead of one per file.
+        self.bm25_service.begin_bulk()
+        try:
             try:
-                self._ingest_file(path)
-            except Exception as exc:  # pylint: disable=broad-except
-                logger.exception("Failed to ingest %s: %s", path, exc)
+                # Parsing the next files overlaps with embedding and storing the current one.
+                run_pipeline(
+                    files,
+                    self._prepare_file,
+                    self._chunk_texts,
+                    self.embedding_service.embed_texts,
+                    partial(self._store_file, batch),
+                    self._log_failure,
+                    prepare_workers=self.prepare_workers,
+                    embed_window=self.embed_window,
+                )
+            finally:
+                # Runs the last batch's BM25 updates, so it must precede the BM25 flush.
+                batch.close()
+        finally:
+            self.bm25_service.flush()
+
+    @staticmethod
+    def _log_failure(path: Path, exc: Exception) -> None:
+        logger.exception("Failed to ingest %s: %s", path, exc, exc_info=exc)
 
-    def _ingest_file(self, path: Path) -> None:
+    def _prepare_file(self, path: Path) -> PreparedMarkdown | None:
         path_str = str(path.resolve())
         logger.info("Ingesting %s", path_str)
-        document_data = self._load_markdown(path)
+        raw = path.read_bytes()
+        checksum = hashlib.sha256(raw).hexdigest()
+        # Unchanged documents are skipped before parsing, chunking, or embedding.
+        if stored_checksum(path_str) == checksum:
+            logger.info("Skipping unchanged document %s", path_str)
+            return None
+        document_data = self._load_markdown(path, raw, checksum)
         if document_data is None:
             logger.warning("Skipping empty document %s", path_str)
-            return
+            return None
 
         content_lines = document_data["content"].splitlines()
         sections = self._split_sections(content_lines, default_title=document_data["title"])
         chunks = list(self._generate_chunks(sections))
         if not chunks:
             logger.warning("No chunks generated for %s", path_str)
-            return
+            return None
+        return PreparedMarkdown(path_str=path_str, document_data=document_data, chunks=chunks)
 
-        embeddings = self.embedding_service.embed_texts(chunk.text for chunk in chunks)
-        if len(embeddings) != len(chunks):
-            raise RuntimeError("Embedding count does not match chunk count")
+    @staticmethod
+    def _chunk_texts(prepared: PreparedMarkdown) -> List[str]:
+        return [chunk.text for chunk in prepared.chunks]
 
+    def _store_file(
+        self, batch: BatchedSession, prepared: PreparedMarkdown, embeddings: Sequence[Sequence[float]]
+    ) -> None:
+        path_str, document_data, chunks = prepared.path_str, prepared.document_data, prepared.chunks
         bm25_payloads: List[dict] = []
         removed_chunk_ids: List[int] = []
-        with session_scope() as session:
+        with batch.unit() as session:
             existing: Document | None = session.query(Document).filter_by(path=path_str).one_or_none()
             metadata = document_data["metadata"]
             if existing and existing.sha256 == document_data["sha256"]:
@@ -114,31 +184,33 @@ class MarkdownIngestService:
                 session.flush()
             else:
                 document = existing
-                removed_chunk_ids = [chunk.id for chunk in list(document.chunks)]
+                removed_chunk_ids = delete_document_chunks(session, document.id)
                 document.title = document_data["title"]
                 document.sha256 = document_data["sha256"]
                 document.size = document_data["size"]
                 document.meta = metadata
                 document.confidentiality_tag = metadata.get("confidentiality", document.confidentiality_tag)
-                document.chunks.clear()
                 session.flush()
 
-            for ordinal, (chunk, embedding) in enumerate(zip(chunks, embeddings), start=1):
-                chunk_model = Chunk(
-                    document_id=document.id,
-                    ordinal=ordinal,
-                    text=chunk.text,
-                    start_line=chunk.start_line,
-                    end_line=chunk.end_line,
-                    page_no=None,
-                    token_count=chunk.token_count,
-                    embedding=embedding,
-                )
-                session.add(chunk_model)
-                session.flush()
+            chunk_ids = bulk_insert_chunks(
+                session,
+                document.id,
+                [
+                    {
+                        "ordinal": ordinal,
+                        "text": chunk.text,
+                        "start_line": chunk.start_line,
+                        "end_line": chunk.end_line,
+                        "token_count": chunk.token_count,
+                        "embedding": embedding,
+                    }
+                    for ordinal, (chunk, embedding) in enumerate(zip(chunks, embeddings), start=1)
+                ],
+            )
+            for chunk_id, chunk in zip(chunk_ids, chunks):
                 bm25_payloads.append(
                     {
-                        "chunk_id": chunk_model.id,
+                        "chunk_id": chunk_id,
                         "document_id": document.id,
                         "path": document.path,
                         "title": document.title,
@@ -149,19 +221,24 @@ class MarkdownIngestService:
                     }
                 )
             logger.info("Stored %d chunks for %s", len(chunks), path_str)
+        # The BM25 index only learns about the chunks once their transaction has committed.
+        batch.after_commit(partial(self._update_bm25, removed_chunk_ids, bm25_payloads))
+
+    def _update_bm25(self, removed_chunk_ids: List[int], bm25_payloads: List[dict]) -> None:
         if removed_chunk_ids:
             self.bm25_service.remove_chunks(removed_chunk_ids)
         if bm25_payloads:
             self.bm25_service.add_documents(bm25_payloads)
 
-    def _load_markdown(self, path: Path) -> Optional[dict[str, object]]:
-        post = frontmatter.load(path)
+    def _load_markdown(self, path: Path, raw: bytes, sha256: str) -> Optional[dict[str, object]]:
+        # Universal newlines, as frontmatter.load(path) gets from text-mode open().
+        text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        handler = frontmatter.detect_format(text.lstrip(), _FRONTMATTER_HANDLERS)
+        post = frontmatter.loads(text, handler=handler)
         content = post.content.strip()
         if not content:
             return None
 
-        raw = path.read_bytes()
-        sha256 = hashlib.sha256(raw).hexdigest()
         metadata = dict(post.metadata or {})
         title = self._resolve_title(metadata, content, path)
 
@@ -176,31 +253,33 @@ class MarkdownIngestService:
     def _resolve_title(self, metadata: dict[str, object], content: str, path: Path) -> str:
         if isinstance(metadata.get("title"), str) and metadata["title"].strip():
             return metadata["title"].strip()
-        for line in content.splitlines():
-            if match := self.heading_pattern.match(line):
-                return match.group(2).strip()
+        if "#" in content and (match := self.heading_pattern.search("\n".join(content.splitlines()))):
+            return match.group(2).strip()
         return path.stem.replace("_", " ").title()
 
     def _split_sections(self, lines: List[str], default_title: str) -> List[Section]:
-        sections: List[Section] = []
-        current_lines: List[str] = []
-        current_title = default_title
-        current_start = 1
-
-        for index, line in enumerate(lines, start=1):
-            match = self.heading_pattern.match(line)
-            if match:
-                if current_lines:
-                    sections.append(Section(title=current_title, start_line=current_start, lines=current_lines))
-                current_title = match.group(2).strip()
-                current_start = index
-                current_lines = [line]
-            else:
-                current_lines.append(line)
-
-        if current_lines:
-            sections.append(Section(title=current_title, start_line=current_start, lines=current_lines))
+        if not lines:
+            return []
+        text = "\n".join(lines)
+        if "#" not in text:
+            return [Section(title=default_title, start_line=1, lines=lines)]
+
+        # One scan over the whole text; line indexes come from counting newlines between matches.
+        headings: List[tuple[int, str]] = []
+        line_index = 0
+        position = 0
+        for match in self.heading_pattern.finditer(text):
+            line_index += text.count("\n", position, match.start())
+            position = match.start()
+            headings.append((line_index, match.group(2).strip()))
 
+        sections: List[Section] = []
+        if not headings or headings[0][0] > 0:
+            end = headings[0][0] if headings else len(lines)
+            sections.append(Section(title=default_title, start_line=1, lines=lines[:end]))
+        for number, (start, title) in enumerate(headings):
+            end = headings[number + 1][0] if number + 1 < len(headings) else len(lines)
+            sections.append(Section(title=title, start_line=start + 1, lines=lines[start:end]))
         return sections
 
     def _generate_chunks(self, sections: List[Section]) -> Iterator[ChunkPayload]:
@@ -208,17 +287,19 @@ class MarkdownIngestService:
         overlap_tokens = max(1, int(max_tokens * self.overlap_ratio))
 
         for section in sections:
-            lines = section.lines
-            tokens_per_line = [self._count_tokens(line) for line in lines]
+            # Stripped once per section: overlapping windows revisit lines, and a whitespace-only
+            # line is exactly one whose rstrip() is empty.
+            lines = [line.rstrip() for line in section.lines]
+            # prefix[i] is the token count of lines[:i], so cuts are found by bisection.
+            prefix = [0, *accumulate(self._count_tokens(line) for line in lines)]
             total_lines = len(lines)
             cursor = 0
             while cursor < total_lines:
-                token_sum = 0
-                end_index = cursor
-                while end_index < total_lines and token_sum < max_tokens:
-                    token_sum += tokens_per_line[end_index]
-                    end_index += 1
-                chunk_lines = [line.rstrip() for line in lines[cursor:end_index] if line.strip()]
+                # First end past cursor whose span reaches max_tokens (the span always takes one line).
+                end_index = min(
+                    bisect_left(prefix, prefix[cursor] + max_tokens, cursor + 1, total_lines + 1), total_lines
+                )
+                chunk_lines = [line for line in lines[cursor:end_index] if line]
                 if not chunk_lines:
                     cursor = end_index
                     continue
@@ -229,26 +310,15 @@ class MarkdownIngestService:
                     text=text,
                     start_line=start_line,
                     end_line=end_line,
-                    token_count=token_sum,
+                    token_count=prefix[end_index] - prefix[cursor],
                 )
                 if end_index >= total_lines:
                     break
-                overlap_lines = self._compute_overlap(tokens_per_line[cursor:end_index], overlap_tokens)
-                next_cursor = end_index - overlap_lines
+                # Latest start whose tail span [start, end_index) still covers overlap_tokens.
+                next_cursor = bisect_right(prefix, prefix[end_index] - overlap_tokens, cursor, end_index) - 1
                 cursor = max(cursor + 1, next_cursor)
 
     @staticmethod
     def _count_tokens(text: str) -> int:
-        stripped = text.strip()
-        return len(stripped.split()) if stripped else 0
-
-    @staticmethod
-    def _compute_overlap(tokens_segment: List[int], overlap_tokens: int) -> int:
-        accumulated = 0
-        lines = 0
-        for count in reversed(tokens_segment):
-            accumulated += count
-            lines += 1
-            if accumulated >= overlap_tokens:
-                break
-        return lines
+        # split() drops surrounding whitespace itself, so blank text counts as 0 without a strip.
+        return len(text.split())
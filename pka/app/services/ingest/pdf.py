@@ -1,17 +1,21 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import logging
+from bisect import bisect_right
 from dataclasses import dataclass
+from itertools import accumulate
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import BinaryIO, Iterable, List, Optional, Sequence
 
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LAParams, LTTextContainer
 
-from ...models.db import Chunk, Document, session_scope
+from ...models.db import Document, bulk_insert_chunks, delete_document_chunks, session_scope, stored_checksum
 from ..index.bm25 import BM25IndexService
 from ..index.embed import EmbeddingService
+from .pipeline import run_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,15 @@ class PDFChunkDraft:
     token_count: int
 
 
+@dataclass
+class PreparedPDF:
+    path: Path
+    checksum: str
+    size: int
+    page_count: int
+    chunks: List[PDFChunkDraft]
+
+
 class PDFIngestService:
     """Ingest text-layer PDFs using pdfminer for extraction."""
 
@@ -34,6 +47,8 @@ class PDFIngestService:
         *,
         max_tokens: int = 800,
         overlap_tokens: int = 120,
+        prepare_workers: int = 2,
+        embed_window: int = 64,
     ) -> None:
         self.source_dir = source_dir
         self.embedding_service = embedding_service
@@ -41,6 +56,9 @@ class PDFIngestService:
         self.max_tokens = max_tokens
         self.overlap_tokens = overlap_tokens
         self._laparams = LAParams()
+        self.prepare_workers = prepare_workers
+        # Chunks of consecutive files are packed into embedding calls of about this many texts.
+        self.embed_window = embed_window
 
     def discover(self) -> List[Path]:
         if not self.source_dir.exists():
@@ -53,20 +71,40 @@ class PDFIngestService:
         if limit is not None:
             files = files[:limit]
         logger.info("Processing %d PDF files.", len(files))
-        for path in files:
-            try:
-                self._ingest_file(path)
-            except Exception as exc:  # pragma: no cover - defensive guard
-                logger.exception("Failed to ingest PDF %s: %s", path, exc)
+        # One BM25 commit for the whole run instead of one per PDF.
+        self.bm25_service.begin_bulk()
+        try:
+            # pdfminer extraction of the next files overlaps with embedding and storing the current one.
+            run_pipeline(
+                files,
+                self._prepare_file,
+                self._chunk_texts,
+                self.embedding_service.embed_texts,
+                self._store_file,
+                self._log_failure,
+                prepare_workers=self.prepare_workers,
+                embed_window=self.embed_window,
+            )
+        finally:
+            self.bm25_service.flush()
 
-    def _ingest_file(self, pdf_path: Path) -> None:
+    @staticmethod
+    def _log_failure(path: Path, exc: Exception) -> None:  # pragma: no cover - defensive guard
+        logger.exception("Failed to ingest PDF %s: %s", path, exc, exc_info=exc)
+
+    def _prepare_file(self, pdf_path: Path) -> PreparedPDF | None:
         raw_bytes = pdf_path.read_bytes()
         checksum = hashlib.sha256(raw_bytes).hexdigest()
+        # Unchanged PDFs are skipped before the (slow) pdfminer extraction and embedding.
+        if stored_checksum(str(pdf_path.resolve())) == checksum:
+            logger.info("Skipping unchanged PDF %s", pdf_path)
+            return None
 
-        page_texts = list(self._extract_pages(pdf_path))
+        # pdfminer parses the bytes already read for the checksum instead of reopening the file.
+        page_texts = list(self._extract_pages(io.BytesIO(raw_bytes)))
         if not page_texts:
             logger.warning("PDF %s produced no text; ensure it has a text layer.", pdf_path)
-            return
+            return None
 
         chunk_drafts: List[PDFChunkDraft] = []
         for index, text in enumerate(page_texts, start=1):
@@ -74,13 +112,18 @@ class PDFIngestService:
 
         if not chunk_drafts:
             logger.warning("PDF %s produced no chunks after tokenization; skipping.", pdf_path)
-            return
+            return None
+        return PreparedPDF(
+            path=pdf_path, checksum=checksum, size=len(raw_bytes), page_count=len(page_texts), chunks=chunk_drafts
+        )
 
-        embeddings = self.embedding_service.embed_texts(chunk.text for chunk in chunk_drafts)
-        if len(embeddings) != len(chunk_drafts):
-            raise RuntimeError("Embedding count mismatch during PDF ingestion.")
+    @staticmethod
+    def _chunk_texts(prepared: PreparedPDF) -> List[str]:
+        return [chunk.text for chunk in prepared.chunks]
 
-        document_meta = {"pages": len(page_texts), "ingestion": "pdfminer"}
+    def _store_file(self, prepared: PreparedPDF, embeddings: Sequence[Sequence[float]]) -> None:
+        pdf_path, checksum, chunk_drafts = prepared.path, prepared.checksum, prepared.chunks
+        document_meta = {"pages": prepared.page_count, "ingestion": "pdfminer"}
 
         removed_chunk_ids: List[int] = []
         bm25_payloads: List[dict] = []
@@ -97,37 +140,38 @@ class PDFIngestService:
                     title=pdf_path.stem.replace("_", " ").title(),
                     type="pdf",
                     sha256=checksum,
-                    size=len(raw_bytes),
+                    size=prepared.size,
                     meta=document_meta,
                 )
                 session.add(document)
                 session.flush()
             else:
                 document = existing
-                removed_chunk_ids = [chunk.id for chunk in list(document.chunks)]
+                removed_chunk_ids = delete_document_chunks(session, document.id)
                 document.title = pdf_path.stem.replace("_", " ").title()
                 document.sha256 = checksum
-                document.size = len(raw_bytes)
+                document.size = prepared.size
                 document.meta = document_meta
-                document.chunks.clear()
                 session.flush()
 
-            for ordinal, (draft, embedding) in enumerate(zip(chunk_drafts, embeddings), start=1):
-                chunk = Chunk(
-                    document_id=document.id,
-                    ordinal=ordinal,
-                    text=draft.text,
-                    start_line=None,
-                    end_line=None,
-                    page_no=draft.page_no,
-                    token_count=draft.token_count,
-                    embedding=embedding,
-                )
-                session.add(chunk)
-                session.flush()
+            chunk_ids = bulk_insert_chunks(
+                session,
+                document.id,
+                [
+                    {
+                        "ordinal": ordinal,
+                        "text": draft.text,
+                        "page_no": draft.page_no,
+                        "token_count": draft.token_count,
+                        "embedding": embedding,
+                    }
+                    for ordinal, (draft, embedding) in enumerate(zip(chunk_drafts, embeddings), start=1)
+                ],
+            )
+            for chunk_id, draft in zip(chunk_ids, chunk_drafts):
                 bm25_payloads.append(
                     {
-                        "chunk_id": chunk.id,
+                        "chunk_id": chunk_id,
                         "document_id": document.id,
                         "path": document.path,
                         "title": document.title,
@@ -144,56 +188,43 @@ class PDFIngestService:
             self.bm25_service.add_documents(bm25_payloads)
         logger.info("Stored %d chunks for PDF %s", len(chunk_drafts), pdf_path)
 
-    def _extract_pages(self, pdf_path: Path) -> Iterable[str]:
-        for page_layout in extract_pages(pdf_path, laparams=self._laparams):
-            parts: List[str] = []
-            for element in page_layout:
-                if isinstance(element, LTTextContainer):
-                    parts.append(element.get_text())
-            yield "\n".join(parts).strip()
+    def _extract_pages(self, pdf_file: Path | BinaryIO) -> Iterable[str]:
+        for page_layout in extract_pages(pdf_file, laparams=self._laparams):
+            yield "\n".join(
+                element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+            ).strip()
 
     def _chunk_page(self, page_no: int, text: str) -> List[PDFChunkDraft]:
         paragraphs = [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
         if not paragraphs:
             paragraphs = [text.strip()]
 
-        token_counts = [self._count_tokens(paragraph) for paragraph in paragraphs]
+        # prefix[i] is the token count of paragraphs[:i], so cuts are found by bisection.
+        prefix = [0, *accumulate(self._count_tokens(paragraph) for paragraph in paragraphs)]
         cursor = 0
         chunks: List[PDFChunkDraft] = []
         total = len(paragraphs)
         while cursor < total:
-            token_sum = 0
-            end = cursor
-            while end < total and (token_sum + token_counts[end] <= self.max_tokens or end == cursor):
-                token_sum += token_counts[end]
-                end += 1
+            # Last end whose span fits max_tokens, but always at least one paragraph.
+            end = max(cursor + 1, bisect_right(prefix, prefix[cursor] + self.max_tokens, cursor, total + 1) - 1)
+            token_sum = prefix[end] - prefix[cursor]
             chunk_text = "\n\n".join(paragraphs[cursor:end]).strip()
             if chunk_text:
                 chunks.append(
                     PDFChunkDraft(
                         text=chunk_text,
                         page_no=page_no,
-                        token_count=max(token_sum, self._count_tokens(chunk_text)),
+                        # Paragraph counts add up exactly: "\n\n" joins never merge or split words.
+                        token_count=token_sum,
                     )
                 )
             if end >= total:
                 break
-            overlap = self._compute_overlap(token_counts[cursor:end], self.overlap_tokens)
-            cursor = max(cursor + 1, end - overlap)
+            # Latest start whose tail span [start, end) still covers overlap_tokens.
+            cursor = max(cursor + 1, bisect_right(prefix, prefix[end] - self.overlap_tokens, cursor, end) - 1)
         return chunks
 
     @staticmethod
     def _count_tokens(text: str) -> int:
-        stripped = text.strip()
-        return len(stripped.split()) if stripped else 0
-
-    @staticmethod
-    def _compute_overlap(tokens_segment: List[int], overlap_tokens: int) -> int:
-        accumulated = 0
-        lines = 0
-        for count in reversed(tokens_segment):
-            accumulated += count
-            lines += 1
-            if accumulated >= overlap_tokens:
-                break
-        return lines
+        # split() drops surrounding whitespace itself, so blank text counts as 0 without a strip.
+        return len(text.split())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+ItemT = TypeVar("ItemT")
+PreparedT = TypeVar("PreparedT")
+
+_DONE = object()
+
+
+def run_pipeline(
+    items: Iterable[ItemT],
+    prepare: Callable[[ItemT], Optional[PreparedT]],
+    texts_of: Callable[[PreparedT], Sequence[str]],
+    embed_texts: Callable[[List[str]], Any],
+    store: Callable[[PreparedT, Any], None],
+    on_error: Callable[[ItemT, Exception], None],
+    *,
+    prepare_workers: int = 2,
+    max_pending: int = 4,
+    embed_window: int = 64,
+) -> None:
+    """Run prepare -> embed -> store for every item with the three stages overlapping.
+
+    `prepare` (parse/extract/chunk) runs on a small thread pool at most `max_pending` items
+    ahead. The calling thread packs the texts of consecutive items into one `embed_texts`
+    call of roughly `embed_window` texts and slices the result back per item. A single
+    writer thread drains a bounded queue into `store`, so items are persisted in order, one
+    transaction each. `prepare` returns None to skip an item; an exception in any stage
+    skips only the item(s) it belongs to.
+    """
+
+    store_queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_pending))
+
+    def writer() -> None:
+        while True:
+            entry = store_queue.get()
+            if entry is _DONE:
+                return
+            item, prepared, embeddings = entry
+            try:
+                store(prepared, embeddings)
+            except Exception as exc:  # pylint: disable=broad-except
+                on_error(item, exc)
+
+    window: List[Tuple[ItemT, PreparedT, Sequence[str]]] = []
+    window_size = 0
+
+    def flush_window() -> None:
+        nonlocal window, window_size
+        batch, window, window_size = window, [], 0
+        if not batch:
+            return
+        texts = [text for _, _, item_texts in batch for text in item_texts]
+        try:
+            embeddings = embed_texts(texts)
+            if len(embeddings) != len(texts):
+                raise RuntimeError(f"Embedding count mismatch: {len(embeddings)} for {len(texts)} texts")
+        except Exception as exc:  # pylint: disable=broad-except
+            for item, _, _ in batch:
+                on_error(item, exc)
+            return
+        offset = 0
+        for item, prepared, item_texts in batch:
+            # Blocks while the writer is max_pending items behind.
+            store_queue.put((item, prepared, embeddings[offset : offset + len(item_texts)]))
+            offset += len(item_texts)
+
+    writer_thread = threading.Thread(target=writer, name="ingest-store", daemon=True)
+    writer_thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, prepare_workers), thread_name_prefix="ingest-prepare") as pool:
+            remaining = iter(items)
+            pending: Deque[Tuple[ItemT, Future]] = deque()
+
+            def submit_next() -> None:
+                for item in remaining:
+                    pending.append((item, pool.submit(prepare, item)))
+                    return
+
+            for _ in range(max(1, max_pending)):
+                submit_next()
+            while pending:
+                item, future = pending.popleft()
+                submit_next()
+                try:
+                    prepared = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    on_error(item, exc)
+                    continue
+                if prepared is None:
+                    continue
+                item_texts = texts_of(prepared)
+                window.append((item, prepared, item_texts))
+                window_size += len(item_texts)
+                if window_size >= embed_window:
+                    flush_window()
+            flush_window()
+    finally:
+        store_queue.put(_DONE)
+        writer_thread.join()
+
+
+__all__ = ["run_pipeline"]
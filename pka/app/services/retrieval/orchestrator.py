@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -12,8 +13,11 @@ from ..index.vector import VectorIndexService
 
 logger = logging.getLogger(__name__)
 
+# Runs the BM25 lookup while the caller thread embeds the query and queries pgvector.
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="retrieval")
 
-@dataclass
+
+@dataclass(slots=True)
 class RetrievalResult:
     chunk_id: int
     document_id: int
@@ -60,69 +64,76 @@ class RetrievalOrchestrator:
         if not question:
             return []
 
-        query_vector = self.embedding_service.embed_query(question)
-        bm25_hits = self.bm25_service.search(question, limit=self.max_bm25)
-        vector_hits = self.vector_service.search(session, query_vector, limit=self.max_vector)
-
+        # BM25 does not need the query vector, so it overlaps the embedding call and the
+        # vector search; the latter stays on this thread because the Session is not thread-safe.
+        bm25_future = _SEARCH_POOL.submit(self.bm25_service.search, question, limit=self.max_bm25)
+        try:
+            query_vector = self.embedding_service.embed_query(question)
+            vector_hits = self.vector_service.search(session, query_vector, limit=self.max_vector)
+        except BaseException:
+            bm25_future.cancel()
+            raise
+        bm25_hits = bm25_future.result()
+
+        # Insertion order is the candidate order: BM25 hits first, then vector-only hits.
         merged: Dict[int, RetrievalResult] = {}
 
-        def ensure_result(chunk_id: int, base_payload: dict) -> RetrievalResult:
-            if chunk_id not in merged:
-                merged[chunk_id] = RetrievalResult(
-                    chunk_id=chunk_id,
-                    document_id=int(base_payload.get("document_id", 0)),
-                    path=base_payload.get("path", ""),
-                    title=base_payload.get("title", ""),
-                    content=base_payload.get("content", ""),
-                    start_line=base_payload.get("start_line"),
-                    end_line=base_payload.get("end_line"),
-                    page_no=base_payload.get("page_no"),
-                    token_count=base_payload.get("token_count"),
-                )
-            return merged[chunk_id]
-
         for rank, hit in enumerate(bm25_hits):
-            try:
-                chunk_id = int(hit.get("chunk_id"))
-            except (TypeError, ValueError):
+            chunk_id = self._parse_chunk_id(hit.chunk_id)
+            if chunk_id is None:
                 logger.warning("Skipping BM25 hit with invalid chunk_id: %s", hit)
                 continue
-            result = ensure_result(chunk_id, hit)
-            result.score_bm25 = float(hit.get("score_bm25") or 0.0)
+            result = merged.get(chunk_id)
+            if result is None:
+                result = merged[chunk_id] = RetrievalResult(
+                    chunk_id=chunk_id,
+                    document_id=int(hit.document_id or 0),
+                    path=hit.path,
+                    title=hit.title,
+                    content=hit.content,
+                    start_line=hit.start_line,
+                    end_line=hit.end_line,
+                    page_no=None,
+                    token_count=None,
+                )
+            result.score_bm25 = hit.score_bm25 or 0.0
             result.rank_bm25 = rank
 
         for rank, hit in enumerate(vector_hits):
             chunk_id = int(hit["chunk_id"])
-            result = ensure_result(chunk_id, hit)
+            result = merged.get(chunk_id)
+            if result is None:
+                result = merged[chunk_id] = RetrievalResult(
+                    chunk_id=chunk_id,
+                    document_id=int(hit.get("document_id", 0)),
+                    path=hit.get("path", ""),
+                    title=hit.get("title", ""),
+                    content=hit.get("content", ""),
+                    start_line=hit.get("start_line"),
+                    end_line=hit.get("end_line"),
+                    page_no=hit.get("page_no"),
+                    token_count=hit.get("token_count"),
+                )
             result.score_embed = hit.get("score_embed")
             result.distance = hit.get("distance")
             result.rank_embed = rank
 
-        ordered_ids: List[int] = []
-        for hit in bm25_hits:
-            try:
-                chunk_id = int(hit.get("chunk_id"))
-            except (TypeError, ValueError):
-                continue
-            if chunk_id not in ordered_ids:
-                ordered_ids.append(chunk_id)
-        for hit in vector_hits:
-            chunk_id = int(hit["chunk_id"])
-            if chunk_id not in ordered_ids:
-                ordered_ids.append(chunk_id)
-
         selected: List[RetrievalResult] = []
         doc_counts: Dict[int, int] = {}
-        for chunk_id in ordered_ids:
-            result = merged.get(chunk_id)
-            if not result:
-                continue
-            doc_counts.setdefault(result.document_id, 0)
-            if doc_counts[result.document_id] >= self.diversity_cap:
+        for result in merged.values():
+            count = doc_counts.get(result.document_id, 0)
+            if count >= self.diversity_cap:
                 continue
             selected.append(result)
-            doc_counts[result.document_id] += 1
+            doc_counts[result.document_id] = count + 1
             if len(selected) >= self.final_limit:
                 break
 
         return selected
+
+    @staticmethod
+    def _parse_chunk_id(value: object) -> Optional[int]:
+        try:
+            return int(value)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return None
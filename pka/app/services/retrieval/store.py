@@ -5,9 +5,9 @@ import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Sequence
+from typing import Iterator, List, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Select, insert, select, update
 from sqlalchemy.orm import Session
 
 from ...models.db import Chunk, Document, QAAnswer, QAContext, QARun
@@ -18,7 +18,7 @@ from ..retrieval.orchestrator import RetrievalResult
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReplayRecord:
     run_id: uuid.UUID
     question: str
@@ -32,7 +32,7 @@ class ReplayRecord:
     snippets: List[ContextSnippet]
 
 
-@dataclass
+@dataclass(slots=True)
 class RunSummary:
     run_id: uuid.UUID
     question: str
@@ -70,66 +70,87 @@ class RetrievalStore:
         return run.id
 
     def write_contexts(self, run_id: uuid.UUID, contexts: Sequence[RetrievalResult]) -> None:
-        for rank, context in enumerate(contexts, start=1):
-            entry = QAContext(
-                run_id=run_id,
-                chunk_id=context.chunk_id,
-                rank=rank,
-                score_bm25=context.score_bm25,
-                score_embed=context.score_embed,
-                score_rerank=None,
-                rationale=context.rationale or "",
-            )
-            self.session.add(entry)
+        if not contexts:
+            return
+        # One executemany INSERT instead of unit-of-work bookkeeping for every context row.
+        self.session.execute(
+            insert(QAContext),
+            [
+                {
+                    "run_id": run_id,
+                    "chunk_id": context.chunk_id,
+                    "rank": rank,
+                    "score_bm25": context.score_bm25,
+                    "score_embed": context.score_embed,
+                    "score_rerank": None,
+                    "rationale": context.rationale or "",
+                }
+                for rank, context in enumerate(contexts, start=1)
+            ],
+        )
 
     def write_answer(self, run_id: uuid.UUID, answer_json: dict) -> None:
         record = QAAnswer(run_id=run_id, answer_json=answer_json)
         self.session.merge(record)
 
     def finalize_run(self, run_id: uuid.UUID, *, latency_ms: int, abstained: bool) -> None:
-        run = self.session.get(QARun, run_id)
-        if not run:
+        result = self.session.execute(
+            update(QARun).where(QARun.id == run_id).values(latency_ms=latency_ms, abstained=abstained)
+        )
+        if not result.rowcount:
             logger.error("Attempted to finalize missing run %s", run_id)
-            return
-        run.latency_ms = latency_ms
-        run.abstained = abstained
-        self.session.add(run)
 
     def replay(self, run_id: uuid.UUID) -> ReplayRecord | None:
-        run = self.session.get(QARun, run_id)
-        if not run:
-            return None
-        answer_row = self.session.get(QAAnswer, run_id)
-        if not answer_row:
-            return None
-        answer = ChatAnswer.model_validate(answer_row.answer_json)
-
+        # One round trip: the run and its answer, outer-joined to its ranked contexts.
         stmt = (
-            select(QAContext, Chunk, Document)
+            select(
+                QARun.question,
+                QARun.mode,
+                QARun.llm_version,
+                QARun.prompt_version,
+                QARun.template_hash,
+                QARun.latency_ms,
+                QARun.abstained,
+                QAAnswer.answer_json,
+                QAContext.rationale,
+                QAContext.score_bm25,
+                QAContext.score_embed,
+                Chunk.id.label("chunk_id"),
+                Chunk.document_id,
+                Chunk.text,
+                Chunk.start_line,
+                Chunk.end_line,
+                Chunk.page_no,
+                Document.path,
+            )
+            .join(QAAnswer, QAAnswer.run_id == QARun.id)
+            .outerjoin(QAContext, QAContext.run_id == QARun.id)
             .outerjoin(Chunk, QAContext.chunk_id == Chunk.id)
             .outerjoin(Document, Chunk.document_id == Document.id)
-            .where(QAContext.run_id == run_id)
+            .where(QARun.id == run_id)
             .order_by(QAContext.rank)
         )
-        snippets: List[ContextSnippet] = []
-        for ctx, chunk, document in self.session.execute(stmt).all():
-            if chunk is None:
-                continue
-            citation = self._build_citation(chunk, document)
-            snippets.append(
-                ContextSnippet(
-                    document_id=chunk.document_id,
-                    chunk_id=chunk.id,
-                    content=chunk.text,
-                    citation=citation,
-                    rationale=ctx.rationale or "",
-                    score_bm25=ctx.score_bm25,
-                    score_embed=ctx.score_embed,
-                )
+        rows = self.session.execute(stmt).all()
+        if not rows:
+            return None
+        run = rows[0]
+
+        snippets: List[ContextSnippet] = [
+            ContextSnippet(
+                document_id=row.document_id,
+                chunk_id=row.chunk_id,
+                content=row.text,
+                citation=self._build_citation(row.path, row.start_line, row.end_line, row.page_no),
+                rationale=row.rationale or "",
+                score_bm25=row.score_bm25,
+                score_embed=row.score_embed,
             )
+            for row in rows
+            if row.chunk_id is not None
+        ]
 
         return ReplayRecord(
-            run_id=run.id,
+            run_id=run_id,
             question=run.question,
             mode=run.mode,
             llm_version=run.llm_version,
@@ -137,37 +158,38 @@ class RetrievalStore:
             template_hash=run.template_hash,
             latency_ms=run.latency_ms,
             abstained=run.abstained,
-            answer=answer,
+            answer=ChatAnswer.model_validate(run.answer_json),
             snippets=snippets,
         )
 
     @staticmethod
-    def _build_citation(chunk: Chunk, document: Document | None) -> str:
-        path = Path(document.path).name if document else "unknown"
-        if chunk.start_line and chunk.end_line:
-            return f"{path}:L{chunk.start_line}-L{chunk.end_line}"
-        if chunk.page_no:
-            return f"{path}:p.{chunk.page_no}"
+    def _build_citation(
+        document_path: str | None, start_line: int | None, end_line: int | None, page_no: int | None
+    ) -> str:
+        path = Path(document_path).name if document_path else "unknown"
+        if start_line and end_line:
+            return f"{path}:L{start_line}-L{end_line}"
+        if page_no:
+            return f"{path}:p.{page_no}"
         return path
 
     def list_runs(self, limit: int = 20) -> List[RunSummary]:
-        stmt = (
-            select(QARun)
-            .order_by(QARun.started_at.desc())
-            .limit(limit)
-        )
-        rows = self.session.execute(stmt).scalars().all()
-        return [
-            RunSummary(
-                run_id=row.id,
-                question=row.question,
-                mode=row.mode,
-                started_at=row.started_at,
-                latency_ms=row.latency_ms,
-                abstained=row.abstained,
-            )
-            for row in rows
-        ]
+        stmt = self._run_summaries().limit(limit)
+        return [RunSummary(*row) for row in self.session.execute(stmt)]
+
+    def iter_runs(self, *, batch_size: int = 100) -> Iterator[RunSummary]:
+        """Yield every run summary, newest first, fetching `batch_size` rows at a time."""
+
+        stmt = self._run_summaries().execution_options(yield_per=batch_size)
+        for row in self.session.execute(stmt):
+            yield RunSummary(*row)
+
+    @staticmethod
+    def _run_summaries() -> Select:
+        # Columns in RunSummary field order; no QARun objects are hydrated.
+        return select(
+            QARun.id, QARun.question, QARun.mode, QARun.started_at, QARun.latency_ms, QARun.abstained
+        ).order_by(QARun.started_at.desc())
 
 
 __all__ = ["RetrievalStore", "ReplayRecord", "RunSummary"]
@@ -1,6 +1,14 @@
 """Synthesis services powered by local Ollama chat models."""
 
+from .cache import SemanticAnswerCache
 from .llama_local import ChatService, ChatServiceError, ChatServiceValidationError
 from .templates import PromptTemplate, PromptTemplateRegistry
 
-__all__ = ["ChatService", "ChatServiceError", "ChatServiceValidationError", "PromptTemplate", "PromptTemplateRegistry"]
+__all__ = [
+    "ChatService",
+    "ChatServiceError",
+    "ChatServiceValidationError",
+    "PromptTemplate",
+    "PromptTemplateRegistry",
+    "SemanticAnswerCache",
+]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Size-bounded LRU of validated answers, matched by question similarity.
+
+    An entry only matches lookups with an equal `key` (snippet chunk ids, mode, template,
+    model); among those, the cached question whose embedding has the highest cosine
+    similarity wins if it reaches `threshold`. The 0.95 default is deliberately tight: with
+    nomic-embed-text, different questions about the same snippets often score around 0.85-0.9.
+    Unit-normalised question embeddings live in one preallocated (max_entries, dim) matrix,
+    so a lookup is a single matrix-vector product.
+    An exact (key, question) tier in front of it answers verbatim repeats without an embedding.
+    """
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.95, max_exact_entries: int = 1024) -> None:
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.max_exact_entries = max(1, max_exact_entries)
+        self._exact: "OrderedDict[Tuple[Hashable, str], dict]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._answers: List[Optional[dict]] = [None] * self.max_entries
+        self._keys: List[Hashable] = [None] * self.max_entries
+        self._slots_by_key: Dict[Hashable, List[int]] = {}
+        # Occupied slots, least recently used first.
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def lookup_exact(self, key: Hashable, question: str) -> Optional[dict]:
+        """Return the answer JSON cached for exactly this question under `key`, or None."""
+
+        with self._lock:
+            answer = self._exact.get((key, question))
+            if answer is not None:
+                self._exact.move_to_end((key, question))
+            return answer
+
+    def store_exact(self, key: Hashable, question: str, answer_json: dict) -> None:
+        with self._lock:
+            self._exact[(key, question)] = answer_json
+            self._exact.move_to_end((key, question))
+            while len(self._exact) > self.max_exact_entries:
+                self._exact.popitem(last=False)
+
+    def lookup(self, key: Hashable, vector: np.ndarray) -> Optional[dict]:
+        """Return the answer JSON of the closest cached question under `key`, or None."""
+
+        unit = self._normalise(vector)
+        if unit is None:
+            return None
+        with self._lock:
+            slots = self._slots_by_key.get(key)
+            if not slots or self._matrix is None or self._matrix.shape[1] != unit.shape[0]:
+                return None
+            similarities = self._matrix[slots] @ unit
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            slot = slots[best]
+            self._lru.move_to_end(slot)
+            return self._answers[slot]
+
+    def store(self, key: Hashable, vector: np.ndarray, answer_json: dict) -> None:
+        unit = self._normalise(vector)
+        if unit is None:
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, unit.shape[0]), dtype=np.float32)
+            elif self._matrix.shape[1] != unit.shape[0]:
+                return
+            if len(self._lru) < self.max_entries:
+                slot = len(self._lru)
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                evicted = self._slots_by_key[self._keys[slot]]
+                evicted.remove(slot)
+                if not evicted:
+                    del self._slots_by_key[self._keys[slot]]
+            self._matrix[slot] = unit
+            self._keys[slot] = key
+            self._answers[slot] = answer_json
+            self._slots_by_key.setdefault(key, []).append(slot)
+            self._lru[slot] = None
+
+    @staticmethod
+    def _normalise(vector: np.ndarray) -> Optional[np.ndarray]:
+        unit = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(unit))
+        if not norm:
+            return None
+        return unit / norm
+
+
+__all__ = ["SemanticAnswerCache"]
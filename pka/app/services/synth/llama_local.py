@@ -1,23 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import textwrap
 from copy import deepcopy
+from functools import lru_cache
 from json import JSONDecodeError
 from pathlib import Path
-from typing import List, Sequence
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
 
 import httpx
+import numpy as np
 from jsonschema import Draft7Validator, ValidationError
 
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover - optional dependency
+    fastjsonschema = None  # type: ignore[assignment]
+
+from ...core.http_clients import acquire_client, release_client
+from ...core.serialization import dumps as json_dumps, loads as json_loads
 from ...models.schema import ChatAnswer
+from ..index.embed import EmbeddingService, EmbeddingServiceError
 from ..retrieval.context_builder import ContextSnippet
+from .cache import SemanticAnswerCache
 from .templates import PromptTemplate
 from .templates import PromptTemplateRegistry
 
 logger = logging.getLogger(__name__)
 
+# Payloads are serialised with orjson (when installed) and sent as raw content.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class ChatServiceError(RuntimeError):
     """Base exception raised when synthesis fails."""
@@ -27,6 +42,91 @@ class ChatServiceValidationError(ChatServiceError):
     """Raised when the model output fails schema validation."""
 
 
+# Returns the first validation error message, or None when the data matches the schema.
+_SchemaCheck = Callable[[Any], Optional[str]]
+
+
+def _load_schema(schema_path: Path) -> Tuple[str, dict, _SchemaCheck]:
+    stat = schema_path.stat()
+    return _load_schema_cached(str(schema_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_schema_cached(path: str, mtime_ns: int, size: int) -> Tuple[str, dict, _SchemaCheck]:
+    """Read, brace-escape and compile a response schema once per file version."""
+
+    schema_text = Path(path).read_text(encoding="utf-8-sig")
+    schema = json.loads(schema_text)
+    return schema_text.replace("{", "{{").replace("}", "}}"), schema, _compile_schema(schema)
+
+
+def _compile_schema(schema: dict) -> _SchemaCheck:
+    """Compile `schema` to Python code with fastjsonschema when installed, else use jsonschema."""
+
+    if fastjsonschema is not None:
+        validate = fastjsonschema.compile(schema)
+
+        def check(data: Any) -> Optional[str]:
+            try:
+                validate(data)
+            except fastjsonschema.JsonSchemaException as exc:
+                return exc.message
+            return None
+
+        return check
+
+    validator = Draft7Validator(schema)
+
+    def check(data: Any) -> Optional[str]:
+        try:
+            validator.validate(data)
+        except ValidationError as exc:
+            return exc.message
+        return None
+
+    return check
+
+
+class _JSONObjectScanner:
+    """Find where a streamed top-level JSON object ends, tracking braces outside strings."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        # Set once the text is known not to start with "{"; the JSON parse then reports the error.
+        self.rejected = False
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, fragment: str) -> Optional[int]:
+        """Consume `fragment`; return the offset just past the closing brace once it is seen."""
+
+        for offset, char in enumerate(fragment):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                elif not char.isspace():
+                    self.rejected = True
+                    return None
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return offset + 1
+        return None
+
+
 class ChatService:
     """Deterministic Ollama-driven chat synthesis enforcing cite-or-abstain contract."""
 
@@ -49,6 +149,10 @@ class ChatService:
         num_predict: int | None = None,
         num_ctx: int | None = None,
         keep_alive: str | None = None,
+        stream: bool = False,
+        max_concurrency: int | None = None,
+        embedding_service: EmbeddingService | None = None,
+        answer_cache: SemanticAnswerCache | None = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.model = model
@@ -60,6 +164,20 @@ class ChatService:
         self.num_predict = num_predict
         self.num_ctx = num_ctx
         self.keep_alive = keep_alive
+        # Stream tokens and stop reading as soon as the answer object is complete.
+        self.stream = stream
+        # Caps in-flight /api/chat calls; concurrent generate() calls past the cap wait here.
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # Everything but the messages is fixed per service, so the request body is built once.
+        options = {"model": model}
+        optional = {"temperature": temperature, "seed": seed, "num_predict": num_predict, "num_ctx": num_ctx}
+        options.update((key, value) for key, value in optional.items() if value is not None)
+        self._base_payload = {"model": model, "stream": stream, "options": options}
+        if keep_alive:
+            self._base_payload["keep_alive"] = keep_alive
+        # The answer cache serves verbatim repeats; with embeddings it also serves near-duplicates.
+        self.embedding_service = embedding_service
+        self.answer_cache = answer_cache
         self._system_prompt = textwrap.dedent(
             """\
             You are the Personal Knowledge Analyst. Use ONLY the provided context snippets.
@@ -67,11 +185,17 @@ class ChatService:
             - Every claim must cite sources; provide citations using the supplied identifiers.
             - Respond with JSON only. No prose, no markdown, no commentary."""
         ).strip()
-        schema_text = Path(schema_path).read_text(encoding="utf-8-sig")
-        self._schema_prompt = schema_text.replace("{", "{{").replace("}", "}}")
-        self._schema = json.loads(schema_text)
-        self._validator = Draft7Validator(self._schema)
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+        self._schema_prompt, self._schema, self._check_schema = _load_schema(Path(schema_path))
+        # (key, default, needs_copy): only container defaults are deep-copied per response.
+        self._schema_defaults = [
+            (key, definition["default"], isinstance(definition["default"], (dict, list)))
+            for key, definition in self._schema.get("properties", {}).items()
+            if "default" in definition
+        ]
+        # Shares one connection pool with every other service talking to the same Ollama.
+        self._client_key = (self.base_url, timeout)
+        self._client = acquire_client(*self._client_key)
+        self._closed = False
         self._last_raw_response: str | None = None
 
     @property
@@ -81,7 +205,10 @@ class ChatService:
         return self._last_raw_response
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._closed:
+            return
+        self._closed = True
+        await release_client(*self._client_key)
 
     async def generate(
         self,
@@ -91,6 +218,20 @@ class ChatService:
         mode: str,
     ) -> ChatAnswer:
         template = self.template
+        cache_key: Hashable = (tuple(sorted(snippet.chunk_id for snippet in snippets)), mode, template, self.model)
+        cache_question = question.strip()
+        if self.answer_cache is not None:
+            cached = self.answer_cache.lookup_exact(cache_key, cache_question)
+            if cached is not None:
+                logger.debug("Serving exact cached answer for %r", question)
+                return ChatAnswer.model_validate(cached)
+        question_vector = await self._embed_for_cache(cache_question)
+        if question_vector is not None:
+            cached = self.answer_cache.lookup(cache_key, question_vector)
+            if cached is not None:
+                logger.debug("Serving cached answer for %r", question)
+                return ChatAnswer.model_validate(cached)
+
         context_block = self._format_context(snippets)
         user_prompt = template.render(
             question=self._escape_braces(question.strip()),
@@ -113,7 +254,22 @@ class ChatService:
             logger.error("Chat service error: %s", exc)
             raise
 
-        return ChatAnswer.model_validate(response_json)
+        answer = ChatAnswer.model_validate(response_json)
+        if self.answer_cache is not None:
+            self.answer_cache.store_exact(cache_key, cache_question, response_json)
+            if question_vector is not None:
+                self.answer_cache.store(cache_key, question_vector, response_json)
+        return answer
+
+    async def _embed_for_cache(self, question: str) -> Optional[np.ndarray]:
+        if self.answer_cache is None or self.embedding_service is None:
+            return None
+        try:
+            # Usually an embed_query cache hit: retrieval already embedded the same question.
+            return await asyncio.to_thread(self.embedding_service.embed_query, question)
+        except EmbeddingServiceError as exc:
+            logger.warning("Answer cache bypassed; question embedding failed: %s", exc)
+            return None
 
     async def _invoke_with_retries(self, messages: List[dict]) -> dict:
         last_error: Exception | None = None
@@ -123,10 +279,9 @@ class ChatService:
             except ChatServiceValidationError as exc:
                 last_error = exc
                 logger.debug("Validation failure (attempt %d): %s", attempt + 1, exc)
-                correction = textwrap.dedent(
-                    f"""\
-                    The previous response was invalid: {exc}
-                    Respond again with strictly valid JSON that satisfies the schema."""
+                correction = (
+                    f"The previous response was invalid: {exc}\n"
+                    "Respond again with strictly valid JSON that satisfies the schema."
                 )
                 messages.append({"role": "user", "content": correction})
             except ChatServiceError as exc:
@@ -138,31 +293,10 @@ class ChatService:
         raise last_error
 
     async def _invoke(self, messages: List[dict]) -> dict:
-        options = {
-            "model": self.model,
-        }
-        if self.temperature is not None:
-            options["temperature"] = self.temperature
-        if self.seed is not None:
-            options["seed"] = self.seed
-        if self.num_predict is not None:
-            options["num_predict"] = self.num_predict
-        if self.num_ctx is not None:
-            options["num_ctx"] = self.num_ctx
-
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": False,
-            "options": options,
-        }
-        if self.keep_alive:
-            payload["keep_alive"] = self.keep_alive
-
-        url = "/api/chat"
+        payload = {**self._base_payload, "messages": messages}
+
         try:
-            response = await self._client.post(url, json=payload)
-            response.raise_for_status()
+            content = await self._fetch_content(payload)
         except httpx.TimeoutException as exc:
             raise ChatServiceError(
                 "Ollama chat request timed out before completing."
@@ -170,17 +304,12 @@ class ChatService:
         except httpx.HTTPError as exc:
             raise ChatServiceError(f"Ollama chat request failed: {exc!s}") from exc
 
-        data = response.json()
-        try:
-            content = data["message"]["content"]
-        except KeyError as exc:
-            raise ChatServiceError("Unexpected Ollama response structure.") from exc
-
         self._last_raw_response = content
         try:
-            parsed = json.loads(content)
+            parsed = json_loads(content)
         except JSONDecodeError as exc:
-            preview = content.strip()
+            # Slice first so a large malformed reply is not copied whole just for the preview.
+            preview = content[:200].strip()
             if len(preview) > 160:
                 preview = f"{preview[:160]}…"
             raise ChatServiceValidationError(
@@ -188,20 +317,64 @@ class ChatService:
             ) from exc
 
         self._apply_schema_defaults(parsed)
-        try:
-            self._validator.validate(parsed)
-        except ValidationError as exc:
-            raise ChatServiceValidationError(f"Response failed schema validation: {exc.message}") from exc
+        error = self._check_schema(parsed)
+        if error is not None:
+            raise ChatServiceValidationError(f"Response failed schema validation: {error}")
 
         return parsed
 
+    async def _fetch_content(self, payload: dict) -> str:
+        fetch = self._stream_content if self.stream else self._request_content
+        if self._slots is None:
+            return await fetch(payload)
+        async with self._slots:
+            return await fetch(payload)
+
+    async def _request_content(self, payload: dict) -> str:
+        response = await self._client.post("/api/chat", content=json_dumps(payload), headers=_JSON_HEADERS)
+        response.raise_for_status()
+        data = json_loads(response.content)
+        try:
+            return data["message"]["content"]
+        except KeyError as exc:
+            raise ChatServiceError("Unexpected Ollama response structure.") from exc
+
+    async def _stream_content(self, payload: dict) -> str:
+        """Collect streamed content until the top-level JSON object closes (or the stream ends).
+
+        Leaving the `stream()` block early closes the connection, so Ollama stops generating
+        whatever the model would have emitted after the object.
+        """
+
+        scanner = _JSONObjectScanner()
+        parts: List[str] = []
+        async with self._client.stream(
+            "POST", "/api/chat", content=json_dumps(payload), headers=_JSON_HEADERS
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    chunk = json_loads(line)
+                    fragment = chunk["message"]["content"]
+                except (JSONDecodeError, KeyError, TypeError) as exc:
+                    raise ChatServiceError("Unexpected Ollama response structure.") from exc
+                end = scanner.feed(fragment)
+                if end is not None:
+                    parts.append(fragment[:end])
+                    break
+                parts.append(fragment)
+                if chunk.get("done") or scanner.rejected:
+                    break
+        return "".join(parts)
+
     def _apply_schema_defaults(self, data: dict) -> None:
         """Populate any missing optional fields with defaults before validation."""
 
-        properties = self._schema.get("properties", {})
-        for key, definition in properties.items():
-            if key not in data and "default" in definition:
-                data[key] = deepcopy(definition["default"])
+        for key, default, needs_copy in self._schema_defaults:
+            if key not in data:
+                data[key] = deepcopy(default) if needs_copy else default
 
     @staticmethod
     def _escape_braces(text: str) -> str:
@@ -212,13 +385,9 @@ class ChatService:
             return "NO_SNIPPETS_AVAILABLE"
         blocks: List[str] = []
         for idx, snippet in enumerate(snippets, start=1):
-            block = textwrap.dedent(
-                f"""\
-                SNIPPET {idx}:
-                citation: {snippet.citation}
-                rationale: {snippet.rationale}
-                text: {snippet.content}"""
-            ).strip()
+            # Plain f-string: dedent() would rescan every line, and multi-line snippet text
+            # would defeat its common-margin detection and leave the template indented.
+            block = f"SNIPPET {idx}:\ncitation: {snippet.citation}\nrationale: {snippet.rationale}\ntext: {snippet.content}"
             blocks.append(self._escape_braces(block))
         return "\n\n".join(blocks)
 
@@ -0,0 +1,26 @@
+import numpy as np
+
+from pka.app.services.synth.cache import SemanticAnswerCache
+
+
+def _at_cosine(base: np.ndarray, cosine: float) -> np.ndarray:
+    """Unit vector whose cosine similarity with `base` is exactly `cosine`."""
+
+    orthogonal = np.zeros_like(base)
+    orthogonal[1] = 1.0
+    return cosine * base + np.sqrt(1.0 - cosine**2) * orthogonal
+
+
+def test_default_threshold_hits_paraphrases_and_misses_other_questions() -> None:
+    cache = SemanticAnswerCache()
+    key = ((2,), "synthesize", "template", "model")
+    question = np.zeros(8, dtype=np.float32)
+    question[0] = 1.0
+    answer = {"answer": "Cached"}
+    cache.store(key, question, answer)
+
+    # A paraphrase embeds almost on top of the cached question.
+    assert cache.lookup(key, _at_cosine(question, 0.97)) == answer
+    # A different question over the same snippets can still score ~0.9; it must not reuse the answer.
+    assert cache.lookup(key, _at_cosine(question, 0.9)) is None
+    assert cache.lookup(key, _at_cosine(question, 0.86)) is None
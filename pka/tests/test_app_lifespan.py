@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from pka.app import main
+from pka.app.core.settings import settings
+
+
+def test_app_shutdown_keeps_services_other_apps_hold(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "skip_health_checks", True)
+    first = main.create_app()
+    second = main.create_app()
+    assistant = first.state.assistant_service
+
+    with TestClient(second):
+        pass
+    assert second.state.assistant_service is assistant
+    assert assistant._closed is False
+
+    # Reopening an app that already shut down re-acquires the services it holds.
+    with TestClient(second):
+        assert second.state.assistant_service._closed is False
+    assert first.state.assistant_service._closed is False
@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from pka.app.models import db
+
+
+def test_batched_session_commits_in_batches_and_isolates_failed_units(monkeypatch) -> None:
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (value INTEGER)"))
+    monkeypatch.setattr(db, "get_session_local", lambda: sessionmaker(bind=engine, class_=Session))
+
+    committed = []
+    batch = db.BatchedSession(batch_size=2)
+
+    with batch.unit() as session:
+        session.execute(text("INSERT INTO items VALUES (1)"))
+        batch.after_commit(lambda: committed.append(1))
+    try:
+        with batch.unit() as session:
+            session.execute(text("INSERT INTO items VALUES (2)"))
+            batch.after_commit(lambda: committed.append(2))
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert committed == []
+
+    with batch.unit() as session:
+        session.execute(text("INSERT INTO items VALUES (3)"))
+        batch.after_commit(lambda: committed.append(3))
+    assert committed == [1, 3]
+
+    with batch.unit() as session:
+        session.execute(text("INSERT INTO items VALUES (4)"))
+        batch.after_commit(lambda: committed.append(4))
+    batch.close()
+
+    assert committed == [1, 3, 4]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT value FROM items ORDER BY value")).scalars().all() == [1, 3, 4]
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from pka.app.services.index.bm25 import BM25IndexService
+
+
+def _payload(chunk_id: int, content: str) -> dict:
+    return {"chunk_id": chunk_id, "document_id": 1, "path": "doc.md", "title": "Doc", "content": content}
+
+
+def test_writer_lock_is_released_between_writes(tmp_path: Path) -> None:
+    first = BM25IndexService(tmp_path)
+    second = BM25IndexService(tmp_path)
+
+    first.add_documents([_payload(1, "alpha")])
+    # A second owner (another process, in practice) can write once the first has committed.
+    second.add_documents([_payload(2, "beta")])
+
+    first.index.reload()
+    assert sorted(hit.chunk_id for hit in first.search("alpha OR beta")) == ["1", "2"]
+
+
+def test_failed_bulk_write_leaves_no_partial_updates(tmp_path: Path, monkeypatch) -> None:
+    service = BM25IndexService(tmp_path)
+    service.add_documents([_payload(1, "alpha")])
+    apply = BM25IndexService._apply
+
+    def failing_apply(writer, ops):
+        # Apply the call's leading operations, then fail before its last add.
+        if any(op == "add" and value.to_dict()["content"] == ["boom"] for op, value in ops):
+            apply(writer, ops[:-1])
+            raise RuntimeError("writer failure")
+        apply(writer, ops)
+
+    monkeypatch.setattr(BM25IndexService, "_apply", staticmethod(failing_apply))
+    service.begin_bulk()
+    service.add_documents([_payload(2, "beta")])
+    try:
+        service.add_documents([_payload(1, "gamma"), _payload(3, "boom")])
+    except RuntimeError:
+        pass
+    service.add_documents([_payload(4, "delta")])
+    service.flush()
+
+    hits = {hit.chunk_id: hit.content for hit in service.search("alpha OR beta OR gamma OR delta OR boom")}
+    assert hits == {"1": "alpha", "2": "beta", "4": "delta"}
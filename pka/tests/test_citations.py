@@ -3,10 +3,12 @@ from __future__ import annotations
 import json
 from typing import Any, Dict
 
+import numpy as np
 import pytest
 
 from pka.app.services.retrieval.context_builder import ContextBuilder, ContextSnippet
 from pka.app.services.retrieval.orchestrator import RetrievalResult
+from pka.app.services.synth.cache import SemanticAnswerCache
 from pka.app.services.synth.llama_local import ChatService, ChatServiceValidationError
 from pka.app.services.synth.templates import PromptTemplate, PromptTemplateRegistry
 
@@ -92,7 +94,11 @@ async def test_chat_service_retries_on_invalid_json(tmp_path) -> None:
         def json(self) -> Dict[str, Any]:
             return self._payload
 
-    async def _fake_post(url: str, json: Dict[str, Any]) -> _FakeResponse:  # type: ignore[override]
+        @property
+        def content(self) -> bytes:
+            return json.dumps(self.json()).encode("utf-8")
+
+    async def _fake_post(url: str, **kwargs: Any) -> _FakeResponse:  # type: ignore[override]
         call_counter["count"] += 1
         if call_counter["count"] == 1:
             payload = {"message": {"content": "{not valid json"}}
@@ -156,7 +162,11 @@ async def test_chat_service_raises_after_max_retries(tmp_path) -> None:
         def json(self) -> Dict[str, Any]:
             return {"message": {"content": "{still invalid"}}
 
-    async def _fake_post(url: str, json: Dict[str, Any]) -> _FakeResponse:  # type: ignore[override]
+        @property
+        def content(self) -> bytes:
+            return json.dumps(self.json()).encode("utf-8")
+
+    async def _fake_post(url: str, **kwargs: Any) -> _FakeResponse:  # type: ignore[override]
         return _FakeResponse()
 
     service._client.post = _fake_post  # type: ignore[assignment]
@@ -173,3 +183,72 @@ async def test_chat_service_raises_after_max_retries(tmp_path) -> None:
         await service.generate(question="Test failure", snippets=[snippet], mode="synthesize")
 
     await service.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_service_serves_near_duplicate_question_from_cache(tmp_path) -> None:
+    schema_path = tmp_path / "schema.json"
+    _write_schema(schema_path)
+
+    registry = PromptTemplateRegistry()
+    registry.register(PromptTemplate(name="test", version="1", content="{question}\n{context}\n{schema_json}"))
+
+    class _FakeEmbeddings:
+        vectors = {"What is up?": [1.0, 0.0], "What's up?": [0.95, 0.1], "Unrelated": [0.0, 1.0]}
+        calls = 0
+
+        def embed_query(self, query: str) -> np.ndarray:
+            self.calls += 1
+            return np.asarray(self.vectors[query], dtype=np.float32)
+
+    embeddings = _FakeEmbeddings()
+
+    service = ChatService(
+        base_url="http://localhost:11434",
+        model="stub",
+        temperature=0.0,
+        seed=123,
+        timeout=5,
+        template_registry=registry,
+        template_name="test",
+        schema_path=schema_path,
+        embedding_service=embeddings,  # type: ignore[arg-type]
+        answer_cache=SemanticAnswerCache(threshold=0.9),
+    )
+
+    calls = {"count": 0}
+
+    class _FakeResponse:
+        def raise_for_status(self) -> None:
+            return None
+
+        def json(self) -> Dict[str, Any]:
+            content = {"abstain": False, "answer": "Cached", "bullets": [], "conflicts": [], "sources": []}
+            return {"message": {"content": json.dumps(content)}}
+
+        @property
+        def content(self) -> bytes:
+            return json.dumps(self.json()).encode("utf-8")
+
+    async def _fake_post(url: str, **kwargs: Any) -> _FakeResponse:  # type: ignore[override]
+        calls["count"] += 1
+        return _FakeResponse()
+
+    service._client.post = _fake_post  # type: ignore[assignment]
+
+    snippet = ContextSnippet(document_id=1, chunk_id=2, content="Content", citation="doc.md:L1-L2", rationale="")
+    first = await service.generate(question="What is up?", snippets=[snippet], mode="synthesize")
+    second = await service.generate(question="What's up?", snippets=[snippet], mode="synthesize")
+    assert calls["count"] == 1
+    assert second == first
+
+    # A verbatim repeat is answered by the exact tier, before any embedding.
+    third = await service.generate(question=" What is up? ", snippets=[snippet], mode="synthesize")
+    assert third == first
+    assert embeddings.calls == 2
+
+    await service.generate(question="Unrelated", snippets=[snippet], mode="synthesize")
+    await service.generate(question="What is up?", snippets=[snippet], mode="abstain")
+    await service.close()
+
+    assert calls["count"] == 3
@@ -1,11 +1,66 @@
 from __future__ import annotations
 
-from types import SimpleNamespace
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
 
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from pka.app.routers.docs import get_db_session, get_document_service, router as docs_router
+from pka.app.services.docs.service import DocumentService
+
+
+@dataclass(slots=True, frozen=True)
+class _Chunk:
+    id: int
+    ordinal: int
+    text: str
+    start_line: Optional[int]
+    end_line: Optional[int]
+    page_no: Optional[int]
+    token_count: int
+
+
+@dataclass(slots=True, frozen=True)
+class _Document:
+    id: int
+    path: str
+    title: str
+    type: str
+    size: int
+    sha256: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    confidentiality_tag: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+    chunks: Tuple[_Chunk, ...] = ()
+
+
+_SAMPLE_DOCUMENT = _Document(
+    id=1,
+    path="/tmp/doc.md",
+    title="Doc",
+    type="md",
+    size=123,
+    sha256="abc",
+    created_at=None,
+    updated_at=None,
+    confidentiality_tag="private",
+    meta={"tags": ["test"]},
+    chunks=(
+        _Chunk(
+            id=10,
+            ordinal=1,
+            text="This is a sample preview.",
+            start_line=1,
+            end_line=5,
+            page_no=None,
+            token_count=100,
+        ),
+    ),
+)
 
 
 class StubDocumentService:
@@ -18,7 +73,10 @@ class StubDocumentService:
         return self._document
 
 
-def _app_with_overrides(service) -> TestClient:
+@pytest.fixture(scope="module")
+def docs_app():
+    """One app and client for the module; tests only swap the document service override."""
+
     app = FastAPI()
     app.include_router(docs_router)
 
@@ -26,35 +84,19 @@ def _app_with_overrides(service) -> TestClient:
         yield None
 
     app.dependency_overrides[get_db_session] = _override_session
-    app.dependency_overrides[get_document_service] = lambda: service
-    return TestClient(app)
-
-
-def test_fetch_document_success():
-    chunk = SimpleNamespace(
-        id=10,
-        ordinal=1,
-        text="This is a sample preview.",
-        start_line=1,
-        end_line=5,
-        page_no=None,
-        token_count=100,
-    )
-    document = SimpleNamespace(
-        id=1,
-        path="/tmp/doc.md",
-        title="Doc",
-        type="md",
-        size=123,
-        sha256="abc",
-        created_at=None,
-        updated_at=None,
-        confidentiality_tag="private",
-        meta={"tags": ["test"]},
-        chunks=[chunk],
-    )
-    service = StubDocumentService(document)
-    client = _app_with_overrides(service)
+    with TestClient(app) as client:
+        yield app, client
+
+
+def _client_with_service(docs_app, monkeypatch, service) -> TestClient:
+    app, client = docs_app
+    monkeypatch.setitem(app.dependency_overrides, get_document_service, lambda: service)
+    return client
+
+
+def test_fetch_document_success(docs_app, monkeypatch):
+    service = StubDocumentService(_SAMPLE_DOCUMENT)
+    client = _client_with_service(docs_app, monkeypatch, service)
 
     resp = client.get("/api/docs/1")
     assert resp.status_code == 200
@@ -65,9 +107,9 @@ def test_fetch_document_success():
     assert service.requested_ids == [1]
 
 
-def test_fetch_document_not_found():
+def test_fetch_document_not_found(docs_app, monkeypatch):
     service = StubDocumentService(None)
-    client = _app_with_overrides(service)
+    client = _client_with_service(docs_app, monkeypatch, service)
 
     resp = client.get("/api/docs/999")
     assert resp.status_code == 404
@@ -75,6 +117,21 @@ def test_fetch_document_not_found():
     assert service.requested_ids == [999]
 
 
-
-
-
+def test_build_preview_matches_full_normalisation_for_whitespace_heavy_text():
+    service = DocumentService()
+
+    def reference(text: str) -> str:
+        normalized = " ".join(text.split())
+        if len(normalized) <= service.preview_max_chars:
+            return normalized
+        return normalized[: service.preview_max_chars - 3] + "..."
+
+    for text in (
+        "x" * 399 + " " * 1300 + "tail",
+        " " * 2000 + "content after a blank window",
+        "word " * 1000,
+        "short text",
+    ):
+        preview = service._build_preview(text)
+        assert preview == reference(text)
+        assert len(preview) <= service.preview_max_chars
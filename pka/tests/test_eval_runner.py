@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, List
 
+import yaml
+
+from pka.app.core.serialization import dumps
+from pka.app.services.evals import scorer
 from pka.app.services.evals.scorer import EvaluationRunner
 
 
@@ -12,12 +15,20 @@ class DummyResponse:
         self._data = data
         self.status_code = status_code
 
+        self._content: bytes | None = None
+
     def json(self) -> Any:
         return self._data
 
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = dumps(self._data).encode("utf-8")
+        return self._content
+
     @property
     def text(self) -> str:
-        return json.dumps(self._data)
+        return self.content.decode("utf-8")
 
 
 class DummyClient:
@@ -36,15 +47,18 @@ class DummyClient:
         self.closed = True
 
 
-def _dataset(tmp_path: Path, yaml_text: str) -> Path:
+def _dataset(yaml_text: str) -> dict:
+    return yaml.safe_load(yaml_text)
+
+
+def _dataset_file(tmp_path: Path, yaml_text: str) -> Path:
     path = tmp_path / "dataset.yaml"
     path.write_text(yaml_text, encoding="utf-8")
     return path
 
 
-def test_evaluation_runner_no_examples(tmp_path: Path) -> None:
+def test_evaluation_runner_no_examples() -> None:
     dataset = _dataset(
-        tmp_path,
         "metadata:\n  name: empty\nexamples: []\n",
     )
     client = DummyClient([])
@@ -57,9 +71,8 @@ def test_evaluation_runner_no_examples(tmp_path: Path) -> None:
     assert client.closed is False  # external client is not closed by runner
 
 
-def test_evaluation_runner_success(tmp_path: Path) -> None:
+def test_evaluation_runner_success() -> None:
     dataset = _dataset(
-        tmp_path,
         """
 metadata:
   name: sample
@@ -112,9 +125,8 @@ examples:
     assert result["latency_ms"] == 120
 
 
-def test_evaluation_runner_flags_citation_issue(tmp_path: Path) -> None:
+def test_evaluation_runner_flags_citation_issue() -> None:
     dataset = _dataset(
-        tmp_path,
         """
 metadata: {}
 examples:
@@ -149,3 +161,78 @@ examples:
     result = report["results"][0]
     assert result["status"] == "fail"
     assert any("citations" in issue.lower() for issue in result.get("issues", []))
+
+
+def test_evaluation_runner_keeps_dataset_order_with_concurrency() -> None:
+    dataset = _dataset(
+        """
+examples:
+  - question: "First?"
+    expectations:
+      min_sources: 0
+  - mode: synthesize
+  - question: "Third?"
+    expectations:
+      min_sources: 0
+""",
+    )
+    payload = {"latency_ms": 10, "answer": {"abstain": False, "answer": "ok", "sources": []}}
+    client = DummyClient([DummyResponse(payload), DummyResponse(payload)])
+    runner = EvaluationRunner(dataset, client=client, concurrency=4)
+    try:
+        report = runner.run()
+    finally:
+        runner.close()
+    assert [result["index"] for result in report["results"]] == [1, 2, 3]
+    assert [result["status"] for result in report["results"]] == ["pass", "error", "pass"]
+    assert report["summary"]["completed"] == 2
+    assert report["summary"]["failed"] == 1
+
+
+def test_evaluation_runner_asks_repeated_questions_once() -> None:
+    dataset = _dataset(
+        """
+examples:
+  - question: "Same?"
+    expectations:
+      min_sources: 0
+  - question: "Same?"
+    expectations:
+      require_abstain: true
+""",
+    )
+    payload = {"latency_ms": 10, "answer": {"abstain": False, "answer": "ok", "sources": []}}
+    client = DummyClient([DummyResponse(payload)])
+    runner = EvaluationRunner(dataset, client=client)
+    try:
+        report = runner.run()
+    finally:
+        runner.close()
+    assert len(client.requests) == 1
+    assert [result["status"] for result in report["results"]] == ["pass", "fail"]
+
+
+def test_evaluation_runner_reuses_json_sidecar(tmp_path: Path, monkeypatch) -> None:
+    dataset = _dataset_file(
+        tmp_path,
+        "metadata:\n  name: sidecar\nexamples:\n  - question: What is cached?\n",
+    )
+    runner = EvaluationRunner(dataset, client=DummyClient([]), sidecar_cache=True)
+    parsed = runner._load_dataset()
+    assert (tmp_path / "dataset.yaml.cache.json").exists()
+
+    scorer._DATASET_CACHE.clear()
+
+    def fail_yaml(*args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("YAML should not be re-parsed")
+
+    monkeypatch.setattr(scorer.yaml, "load", fail_yaml)
+    assert runner._load_dataset() == parsed
+
+
+def test_evaluation_runner_skips_sidecar_for_lossy_json(tmp_path: Path) -> None:
+    dataset = _dataset_file(tmp_path, "metadata:\n  1: numeric key\nexamples: []\n")
+    runner = EvaluationRunner(dataset, client=DummyClient([]), sidecar_cache=True)
+
+    assert runner._load_dataset()["metadata"] == {1: "numeric key"}
+    assert not (tmp_path / "dataset.yaml.cache.json").exists()
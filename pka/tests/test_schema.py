@@ -2,11 +2,21 @@ import json
 from pathlib import Path
 
 import jsonschema
+import pytest
 
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "app" / "services" / "synth" / "response_schema.json"
 
-def test_chat_response_schema_accepts_valid_payload() -> None:
-    schema_path = Path("pka/app/services/synth/response_schema.json")
-    schema = json.loads(schema_path.read_text(encoding="utf-8"))
+
+@pytest.fixture(scope="session")
+def chat_validator():
+    # json.loads detects the encoding (and the file's UTF-8 BOM) from bytes.
+    schema = json.loads(SCHEMA_PATH.read_bytes())
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+def test_chat_response_schema_accepts_valid_payload(chat_validator) -> None:
     sample = {
         "abstain": False,
         "answer": "Sample grounded answer.",
@@ -20,4 +30,4 @@ def test_chat_response_schema_accepts_valid_payload() -> None:
         "sources": [{"id": "doc:1", "loc": "L10-L12"}],
     }
 
-    jsonschema.validate(sample, schema)
+    chat_validator.validate(sample)
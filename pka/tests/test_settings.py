@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from pka.app.core.settings import AppSettings
+
+
+def test_settings_accept_explicit_env_file(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("APP_NAME", raising=False)
+    env_file = tmp_path / "custom.env"
+    env_file.write_text("APP_NAME=FromCustomFile\n", encoding="utf-8")
+
+    assert AppSettings(_env_file=env_file, _env_file_encoding="utf-8").app_name == "FromCustomFile"
+    assert AppSettings(_env_file=None).app_name == "NestAi"
+
+
+def test_settings_reject_unknown_env_file_keys(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("OLAMA_BASE_URL", raising=False)
+    env_file = tmp_path / "typo.env"
+    env_file.write_text("OLAMA_BASE_URL=http://localhost:11434\n", encoding="utf-8")
+
+    with pytest.raises(ValidationError, match="olama_base_url"):
+        AppSettings(_env_file=env_file)
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import re
+import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, FrozenSet, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.request import urlopen
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 VENV_DIR = PROJECT_ROOT / ".venv"
+MIN_PIP_VERSION = (24, 0)
+MODEL_MARKER = VENV_DIR / ".ollama_model_ok"
+MODEL_MARKER_TTL_SECONDS = 6 * 60 * 60
+# KEY=value lines, both sides stripped; blank lines, comments and lines without "=" never match.
+_ENV_LINE = re.compile(r"^[ \t]*([^#\s=][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
 
 
 def main() -> None:
@@ -23,14 +33,25 @@ def main() -> None:
     parser.add_argument("--no-reload", dest="reload", action="store_false", help="Disable uvicorn auto-reload.")
     parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"), help="Bind address for uvicorn.")
     parser.add_argument("--port", default=os.environ.get("PORT", "8000"), help="Port for uvicorn.")
+    parser.add_argument(
+        "--force-check", action="store_true", help="Query Ollama for the model even if it was verified recently."
+    )
     args = parser.parse_args()
 
     python_exe = ensure_virtualenv()
-    if not args.skip_install:
-        install_dependencies(python_exe)
-
     base_url, model = resolve_ollama_config()
-    ensure_model_available(base_url, model)
+    if not args.force_check and model_recently_verified(base_url, model):
+        print(f"==> Ollama model '{model}' was verified recently (use --force-check to re-query)")
+        if not args.skip_install:
+            install_dependencies(python_exe)
+    else:
+        # The tag query only needs the daemon, so it runs while dependencies install.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tags = executor.submit(fetch_ollama_tags, base_url)
+            if not args.skip_install:
+                install_dependencies(python_exe)
+            ensure_model_available(base_url, model, tags.result())
+        record_model_verified(base_url, model)
     start_uvicorn(python_exe, args.host, args.port, args.reload)
 
 
@@ -45,9 +66,34 @@ def ensure_virtualenv() -> Path:
 
 
 def install_dependencies(python_exe: Path) -> None:
+    requirements = PROJECT_ROOT / "requirements.txt"
+    if not requirements.exists():
+        print(f"!! {requirements.name} not found; skipping dependency install (use --skip-install to silence)")
+        return
+    digest = hashlib.sha256(requirements.read_bytes()).hexdigest()
+    stamp = VENV_DIR / ".requirements.sha256"
+    if stamp.exists() and stamp.read_text(encoding="utf-8").strip() == digest:
+        print("==> Dependencies unchanged since last install")
+        return
     print("==> Installing project dependencies")
-    run_subprocess([str(python_exe), "-m", "pip", "install", "--upgrade", "pip"])
-    run_subprocess([str(python_exe), "-m", "pip", "install", "-r", str(PROJECT_ROOT / "requirements.txt")])
+    uv = shutil.which("uv")
+    if uv:
+        # `install`, not `sync`: sync would uninstall pip and any tools added to the venv by hand.
+        run_subprocess([uv, "pip", "install", "--python", str(python_exe), "-r", str(requirements)])
+    else:
+        if venv_pip_version(python_exe) < MIN_PIP_VERSION:
+            run_subprocess([str(python_exe), "-m", "pip", "install", "--upgrade", "pip"])
+        run_subprocess([str(python_exe), "-m", "pip", "install", "-r", str(requirements)])
+    stamp.write_text(digest, encoding="utf-8")
+
+
+def venv_pip_version(python_exe: Path) -> Tuple[int, ...]:
+    # Ask the venv's pip; this interpreter's pip may be a different version. (0,) forces an upgrade.
+    result = subprocess.run(
+        [str(python_exe), "-m", "pip", "--version"], capture_output=True, text=True, check=False
+    )
+    match = re.match(r"pip (\d+)\.(\d+)", result.stdout)
+    return (int(match.group(1)), int(match.group(2))) if match else (0,)
 
 
 def resolve_ollama_config() -> Tuple[str, str]:
@@ -60,14 +106,8 @@ def resolve_ollama_config() -> Tuple[str, str]:
 def load_env_file(path: Path) -> Dict[str, str]:
     if not path.exists():
         return {}
-    values: Dict[str, str] = {}
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        values[key.strip()] = strip_quotes(value.strip())
-    return values
+    text = path.read_text(encoding="utf-8")
+    return {key: strip_quotes(value) for key, value in _ENV_LINE.findall(text)}
 
 
 def strip_quotes(value: str) -> str:
@@ -76,13 +116,15 @@ def strip_quotes(value: str) -> str:
     return value
 
 
-def ensure_model_available(base_url: str, model: str) -> None:
-    payload, error = fetch_ollama_tags(base_url)
+def ensure_model_available(
+    base_url: str, model: str, tags: Tuple[FrozenSet[str], str | None] | None = None
+) -> None:
+    names, error = tags if tags is not None else fetch_ollama_tags(base_url)
     if error:
         print(f"!! Could not reach Ollama at {base_url}: {error}")
         print("   Start the daemon with `ollama serve` and try again.")
         raise SystemExit(2)
-    if model_present(payload, model):
+    if model in names:
         print(f"==> Ollama model '{model}' is available")
         return
     print(f"==> Pulling Ollama model '{model}'")
@@ -90,34 +132,48 @@ def ensure_model_available(base_url: str, model: str) -> None:
         run_subprocess(["ollama", "pull", model])
     except FileNotFoundError as exc:
         raise SystemExit("The `ollama` CLI was not found on PATH. Install Ollama first.") from exc
-    payload, error = fetch_ollama_tags(base_url)
+    # Always re-query after the pull: the earlier tag list is stale by definition.
+    names, error = fetch_ollama_tags(base_url)
     if error:
         raise SystemExit(f"Failed to verify Ollama after pull: {error}")
-    if not model_present(payload, model):
+    if model not in names:
         raise SystemExit(f"Ollama model '{model}' is still missing. Check the daemon logs and retry.")
     print(f"==> Ollama model '{model}' is ready")
 
 
-def fetch_ollama_tags(base_url: str) -> Tuple[Dict[str, object] | None, str | None]:
+def model_recently_verified(base_url: str, model: str) -> bool:
+    try:
+        marker_base_url, marker_model, verified_at = MODEL_MARKER.read_text(encoding="utf-8").splitlines()
+        age = time.time() - float(verified_at)
+    except (OSError, ValueError):
+        return False
+    return (marker_base_url, marker_model) == (base_url, model) and 0 <= age < MODEL_MARKER_TTL_SECONDS
+
+
+def record_model_verified(base_url: str, model: str) -> None:
+    MODEL_MARKER.write_text(f"{base_url}\n{model}\n{time.time()}\n", encoding="utf-8")
+
+
+def fetch_ollama_tags(base_url: str) -> Tuple[FrozenSet[str], str | None]:
     url = f"{base_url.rstrip('/')}/api/tags"
     try:
         with urlopen(url, timeout=30) as response:  # nosec: trusted local daemon
             payload = json.load(response)
     except (HTTPError, URLError) as exc:
-        return None, str(exc)
+        return frozenset(), str(exc)
     except json.JSONDecodeError as exc:
-        return None, f"Invalid JSON from Ollama: {exc}"
-    return payload, None
+        return frozenset(), f"Invalid JSON from Ollama: {exc}"
+    return tag_names(payload), None
 
 
-def model_present(payload: Dict[str, object] | None, model: str) -> bool:
-    if not payload:
-        return False
+def tag_names(payload: Dict[str, object] | None) -> FrozenSet[str]:
+    if not isinstance(payload, dict):
+        return frozenset()
     models = payload.get("models")
     if isinstance(models, dict):
         models = models.values()
     if not isinstance(models, Iterable) or isinstance(models, (str, bytes)):
-        return False
+        return frozenset()
     names = set()
     for item in models:
         if isinstance(item, dict):
@@ -125,7 +181,7 @@ def model_present(payload: Dict[str, object] | None, model: str) -> bool:
             if isinstance(candidate, str) and candidate:
                 names.add(candidate)
     names |= {name.split(":", 1)[0] for name in list(names) if ":" in name}
-    return model in names
+    return frozenset(names)
 
 
 def start_uvicorn(python_exe: Path, host: str, port: str, reload: bool) -> None:
@@ -1,40 +1,21 @@
 import asyncio
-from pathlib import Path
 
-from pka.app.core.settings import settings
 from pka.app.services.retrieval.context_builder import ContextSnippet
-from pka.app.services.synth.llama_local import ChatService
-from pka.app.services.synth.templates import PromptTemplate, PromptTemplateRegistry
+from pka.app.scripts._debug_chat import build_debug_chat_service
 
-registry = PromptTemplateRegistry()
-registry.register(
-    PromptTemplate(
-        name="debug",
-        version="1.0.0",
-        content=(
-            "You must answer the user's question using ONLY these context snippets:\n\n"
-            "{context}\n\n"
-            "Question: {question}\n\n"
-            "Return a JSON object matching this schema exactly:\n\n"
-            "{schema_json}\n\n"
-            "Rules:\n"
-            "- Cite every claim with the provided citation identifiers.\n"
-            "- If the context is insufficient, set \"abstain\": true and give actionable guidance.\n"
-            "- Do not invent sources or information beyond the snippets."
-        ),
-    )
+DEBUG_TEMPLATE = (
+    "You must answer the user's question using ONLY these context snippets:\n\n"
+    "{context}\n\n"
+    "Question: {question}\n\n"
+    "Return a JSON object matching this schema exactly:\n\n"
+    "{schema_json}\n\n"
+    "Rules:\n"
+    "- Cite every claim with the provided citation identifiers.\n"
+    "- If the context is insufficient, set \"abstain\": true and give actionable guidance.\n"
+    "- Do not invent sources or information beyond the snippets."
 )
 
-chat_service = ChatService(
-    base_url=settings.ollama_base_url,
-    model=settings.ollama_chat_model,
-    temperature=settings.llm_temperature,
-    seed=settings.llm_seed,
-    timeout=settings.ollama_timeout_seconds,
-    template_registry=registry,
-    template_name="debug",
-    schema_path=Path("pka/app/services/synth/response_schema.json"),
-)
+chat_service = build_debug_chat_service(DEBUG_TEMPLATE)
 
 snippet = ContextSnippet(
     document_id=1,
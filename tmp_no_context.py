@@ -1,35 +1,16 @@
 import asyncio
-from pathlib import Path
 
-from pka.app.core.settings import settings
-from pka.app.services.synth.llama_local import ChatService
-from pka.app.services.synth.templates import PromptTemplate, PromptTemplateRegistry
+from pka.app.scripts._debug_chat import build_debug_chat_service
 
-registry = PromptTemplateRegistry()
-registry.register(
-    PromptTemplate(
-        name="debug",
-        version="1.0.0",
-        content=(
-            "You must answer strictly in JSON. Context snippets follow.\n\n"
-            "{context}\n\n"
-            "Question: {question}\n\n"
-            "Schema: {schema_json}\n"
-            "Remember to provide actionable abstain guidance if needed."
-        ),
-    )
+DEBUG_TEMPLATE = (
+    "You must answer strictly in JSON. Context snippets follow.\n\n"
+    "{context}\n\n"
+    "Question: {question}\n\n"
+    "Schema: {schema_json}\n"
+    "Remember to provide actionable abstain guidance if needed."
 )
 
-chat_service = ChatService(
-    base_url=settings.ollama_base_url,
-    model=settings.ollama_chat_model,
-    temperature=settings.llm_temperature,
-    seed=settings.llm_seed,
-    timeout=settings.ollama_timeout_seconds,
-    template_registry=registry,
-    template_name="debug",
-    schema_path=Path("pka/app/services/synth/response_schema.json"),
-)
+chat_service = build_debug_chat_service(DEBUG_TEMPLATE)
 
 async def main():
     answer = await chat_service.generate(